@@ -0,0 +1,158 @@
+import hashlib
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from tamga import Tamga
+from file_transfer import write_atomic
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_used ON blobs (used_at);
+CREATE INDEX IF NOT EXISTS entries_hash ON entries (hash);
+"""
+
+
+def image_extension(content: bytes):
+    return '.png' if content[:8] == b'\x89PNG\r\n\x1a\n' else '.jpg'
+
+
+def resize_cover(content: bytes, max_dimension: int):
+    """JPEG of the image scaled down to fit max_dimension, or None when FFmpeg can't do it"""
+    scale = f"scale='min(iw,{max_dimension})':'min(ih,{max_dimension})':force_original_aspect_ratio=decrease"
+    try:
+        result = subprocess.run(
+            ['ffmpeg', '-v', 'error', '-i', 'pipe:0', '-vf', scale, '-frames:v', '1', '-c:v', 'mjpeg', '-q:v', '3', '-f', 'image2', 'pipe:1'],
+            input=content,
+            capture_output=True,
+        )
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 and result.stdout else None
+
+
+class AssetCache:
+    """
+    Covers kept across runs in `directory`. Files are stored once under
+    their BLAKE2 content hash and found through keys, so a cover shared by
+    many issues is fetched and stored once and handed out as a path without
+    copying. Covers are keyed by URL, scaled ones by URL and size. The least
+    recently used files are evicted when the total exceeds `max_size` bytes.
+    """
+
+    def __init__(self, directory: str, max_size: int = 200 * 1024 * 1024, logger: Tamga = None):
+        self.directory = directory
+        self.max_size = max_size
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'assets.sqlite'), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __lookup(self, key: str):
+        """Path of the file stored under key, marked as used; None when missing"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT blobs.hash, blobs.path FROM entries JOIN blobs ON blobs.hash = entries.hash WHERE entries.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if not os.path.exists(row['path']):
+                self._conn.execute("DELETE FROM blobs WHERE hash = ?", (row['hash'],))
+                self._conn.execute("DELETE FROM entries WHERE hash = ?", (row['hash'],))
+                return None
+            self._conn.execute("UPDATE blobs SET used_at = ? WHERE hash = ?", (time.time(), row['hash']))
+        return row['path']
+
+    def __store(self, key: str, content: bytes, extension: str):
+        digest = hashlib.blake2b(content, digest_size=32).hexdigest()
+        path = os.path.join(self.directory, digest[:2], digest + extension)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_atomic(path, content)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO blobs (hash, path, size, used_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(hash) DO UPDATE SET used_at = excluded.used_at",
+                (digest, path, len(content), time.time()),
+            )
+            self._conn.execute(
+                "INSERT INTO entries (key, hash) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET hash = excluded.hash",
+                (key, digest),
+            )
+        self.__evict(keep=digest)
+        return path
+
+    def __evict(self, keep: str):
+        with self._lock, self._conn:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            if total <= self.max_size:
+                return
+            rows = self._conn.execute("SELECT hash, path, size FROM blobs WHERE hash != ? ORDER BY used_at", (keep,)).fetchall()
+            for row in rows:
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(row['path'])
+                except OSError:
+                    pass
+                self._conn.execute("DELETE FROM blobs WHERE hash = ?", (row['hash'],))
+                self._conn.execute("DELETE FROM entries WHERE hash = ?", (row['hash'],))
+                total -= row['size']
+                self.logger.debug(f"Evicted {row['path']} from the asset cache")
+
+    def cover(self, url: str, max_dimension: int = 0):
+        """Path of the cached cover of url, scaled to fit max_dimension when it is set; None when not cached"""
+        if not max_dimension:
+            return self.__lookup(f'cover:{url}')
+        path = self.__lookup(f'cover:{url}@{max_dimension}')
+        if path is None:
+            original = self.__lookup(f'cover:{url}')
+            if original:
+                with open(original, 'rb') as f:
+                    path = self.__store_resized(url, f.read(), max_dimension)
+        return path
+
+    def put_cover(self, url: str, content: bytes, max_dimension: int = 0):
+        """Store the cover fetched from url; returns its path, scaled like cover() does"""
+        path = self.__store(f'cover:{url}', content, image_extension(content))
+        if max_dimension:
+            return self.__store_resized(url, content, max_dimension) or path
+        return path
+
+    def __store_resized(self, url, content, max_dimension):
+        resized = resize_cover(content, max_dimension)
+        if resized is None:
+            self.logger.warning(f"Could not resize the cover from {url}, using the original")
+            return self.__lookup(f'cover:{url}')
+        return self.__store(f'cover:{url}@{max_dimension}', resized, '.jpg')
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_asset_cache(**kwargs):
+    """Process-wide asset cache, created on first use with the given settings"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AssetCache(**kwargs)
+        return _shared_cache
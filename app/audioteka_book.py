@@ -3,12 +3,28 @@ import os
 from urllib.parse import urlparse
 from tamga import Tamga
 import zipfile
-import json
 from create_podcast import PodcastData
-from bs4 import BeautifulSoup
+from segmented_download import SegmentedDownloader
+from http_cache import HttpCache, shared_client
+from zip_stream import ZipStreamExtractor, ZipStreamError
+from next_data import extract_page_prop
+from playlist import find_playlist
+from content_hash import StreamHash
+from asset_cache import AssetCache
 from datetime import datetime
 import re
 
+
+BASE_URL = 'https://audioteka.com'
+
+
+def fetch_product(http: HttpCache, slug: str, base_url: str = BASE_URL):
+    """The `audiobook` page prop of a product page, or None when the page has none"""
+    r = http.get(f'{base_url.rstrip("/")}/cz/audiokniha/{slug}/')
+    r.raise_for_status()
+    return extract_page_prop(r.content, 'audiobook')
+
+
 class AudiotekaBook:
 
     id: str
@@ -21,31 +37,32 @@ class AudiotekaBook:
     author: str
     album: str
 
-    def __init__(self, slug: str, download_dir:str = None, logger=None):
+    def __init__(self, slug: str, download_dir:str = None, logger=None, http: HttpCache = None, base_url: str = BASE_URL, product: dict = None, cover: bytes = None, assets: AssetCache = None, cover_max_size: int = 0):
         self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self.http = http or shared_client()
         self.download_dir = download_dir
+        self.base_url = base_url.rstrip('/')
         self.extracted_dir = None
+        self.extracted_files = []
         self.cover_path = None
-        self.__parse_product(slug)
-
-    def __parse_product(self, slug: str):
+        self.cover = cover
+        self.assets = assets
+        self.cover_max_size = cover_max_size
+        self.archive = None
+        self.__parse_product(slug, product)
 
-        url = f'https://audioteka.com/cz/audiokniha/{slug}/'
+    def __parse_product(self, slug: str, audiobook: dict = None):
 
         allowed_keys = {'id', 'slug', 'name', 'image_url', 'kind', 'description'}
-        r = requests.get(url)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, 'html.parser')
-        script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
-        if script_tag:
-            json_data = script_tag.string
-            data = json.loads(json_data)
-            for key, value in data['props']['pageProps']['audiobook'].items():
+        if audiobook is None:
+            audiobook = fetch_product(self.http, slug, self.base_url)
+        if audiobook:
+            for key, value in audiobook.items():
                 if key in allowed_keys:
                     setattr(self, key, value)
-            self.created_at = datetime.fromisoformat(data['props']['pageProps']['audiobook']['created_at'])
-            setattr(self, 'author', data['props']['pageProps']['audiobook']['_embedded']['app:author'][0]['name'])
-            setattr(self, 'album', data['props']['pageProps']['audiobook']['_embedded']['app:contained-in'][0]['name'])
+            self.created_at = datetime.fromisoformat(audiobook['created_at'])
+            setattr(self, 'author', audiobook['_embedded']['app:author'][0]['name'])
+            setattr(self, 'album', audiobook['_embedded']['app:contained-in'][0]['name'])
         else:
             self.logger.error("No script tag found in the HTML")
             return None
@@ -55,22 +72,51 @@ class AudiotekaBook:
         if not self.image_url:
             self.logger.error("No image URL found")
             return None
+        if self.assets:
+            self.cover_path = self.assets.cover(self.image_url, self.cover_max_size)
+            if self.cover_path:
+                self.logger.info(f"Cover from the asset cache: {self.cover_path}")
+                return self.cover_path
         try:
-            response = requests.get(self.image_url)
-            response.raise_for_status()
-            self.cover_path = os.path.join(self.extracted_dir, f"{self.__safe_name(self.name)}.jpg")
-            with open(self.cover_path, 'wb') as f:
-                f.write(response.content)
-            self.logger.success(f"Cover downloaded to: {self.cover_path}")
+            if self.cover is None:
+                response = self.http.get(self.image_url, cached=not self.assets)
+                response.raise_for_status()
+                self.cover = response.content
+            if self.assets:
+                self.cover_path = self.assets.put_cover(self.image_url, self.cover, self.cover_max_size)
+            else:
+                self.cover_path = os.path.join(self.extracted_dir, f"{self.__safe_name(self.name)}.jpg")
+                with open(self.cover_path, 'wb') as f:
+                    f.write(self.cover)
+            self.logger.success(f"Cover saved to: {self.cover_path}")
+            return self.cover_path
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Failed to download cover: {e}")
             return None
         
+    def __hashed(self, chunks, digest):
+        for chunk in chunks:
+            digest.update(chunk)
+            yield chunk
+
     def __safe_name(self, str):
         return re.sub(r'[^\w\-]', '_', str)
 
-    def download_file(self, session: requests.Session):
-        url = f"https://audioteka.com/cz/v2/me/audiobooks/{self.id}/download"
+    @property
+    def download_url(self):
+        return f"{self.base_url}/cz/v2/me/audiobooks/{self.id}/download"
+
+    def probe_archive(self, session: requests.Session):
+        """Size and ETag of the archive on the server, without downloading it"""
+        try:
+            info = SegmentedDownloader(session, logger=self.logger).probe(self.download_url)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Could not probe the archive: {e}")
+            return None
+        return {'size': info['size'], 'etag': info['etag']}
+
+    def download_file(self, session: requests.Session, segments: int = 4):
+        url = self.download_url
         if not self.download_dir:
             self.logger.error("Download directory not set")
             return None
@@ -89,18 +135,42 @@ class AudiotekaBook:
         os.makedirs(self.download_dir, exist_ok=True)
 
         try:
-            with session.get(url, stream=True) as response:
-                response.raise_for_status()
-                with open(self.downloaded_file_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=1024):
-                        f.write(chunk)
-                self.logger.success(f"Downloaded to: {self.downloaded_file_path}")
+            downloader = SegmentedDownloader(session, segments=segments, logger=self.logger)
+            self.archive = downloader.download(url, self.downloaded_file_path)
+            self.logger.success(f"Downloaded to: {self.downloaded_file_path}")
+            return True
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Download failed: {e}")
-            if os.path.exists(self.downloaded_file_path):
+            if os.path.exists(self.downloaded_file_path + '.part'):
+                self.logger.info("Partial download kept, it will be resumed on the next run")
+            elif os.path.exists(self.downloaded_file_path):
                 os.remove(self.downloaded_file_path)
             return None
         
+    def stream_extract(self, session: requests.Session):
+        url = self.download_url
+        if not self.download_dir:
+            self.logger.error("Download directory not set")
+            return None
+        self.extracted_dir = os.path.join(self.download_dir, self.name)
+        self.logger.info(f"Streaming: {url} into {self.extracted_dir}")
+        try:
+            with session.get(url, stream=True) as response:
+                response.raise_for_status()
+                extractor = ZipStreamExtractor(self.extracted_dir, logger=self.logger)
+                digest = StreamHash()
+                chunks = self.__hashed(response.iter_content(chunk_size=extractor.chunk_size), digest)
+                members = extractor.extract(chunks)
+                for _ in chunks:
+                    pass
+                self.archive = {'size': digest.size, 'etag': response.headers.get('ETag'), 'hash': digest.hexdigest()}
+            self.extracted_files = members
+            self.logger.success(f"Extracted {len(members)} files to: {self.extracted_dir}")
+            return True
+        except (requests.exceptions.RequestException, ZipStreamError) as e:
+            self.logger.error(f"Streaming extraction failed: {e}")
+            return None
+
     def extract_zip(self):
         if not os.path.exists(self.downloaded_file_path):
             self.logger.error(f"File does not exist: {self.downloaded_file_path}")
@@ -110,16 +180,32 @@ class AudiotekaBook:
         try:
             with zipfile.ZipFile(self.downloaded_file_path, 'r') as zip_ref:
                 zip_ref.extractall(self.extracted_dir)
+                self.extracted_files = [name for name in zip_ref.namelist() if not name.endswith('/')]
                 self.logger.success(f"Extracted to: {self.extracted_dir}")
+            return True
         except zipfile.BadZipFile as e:
             self.logger.error(f"Bad zip file: {e}")
             return None
         
-    def create_podcast_data(self):
+    def podcast_metadata(self):
+        """Issue metadata without paths or cover download, e.g. for the feed"""
+        return PodcastData(
+            self.extracted_dir,
+            None,
+            None,
+            self.name,
+            self.author,
+            self.album,
+            self.created_at.isoformat(),
+            None,
+            self.description,
+        )
+
+    def create_podcast_data(self, output_dir: str = None):
         return PodcastData(
             self.extracted_dir,
-            os.path.join(self.extracted_dir, 'playlist.pls'),
-            os.path.join(self.download_dir, self.__safe_name(self.slug) + '.mp3'),
+            find_playlist(self.extracted_dir, self.extracted_files or None) or os.path.join(self.extracted_dir, 'playlist.pls'),
+            os.path.join(output_dir or self.download_dir, self.__safe_name(self.slug) + '.mp3'),
             self.name,
             self.author,
             self.album,
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+from tamga import Tamga
+from http_cache import HttpCache, shared_client
+from library_index import parse_version
+from next_data import extract_page_prop
+
+
+class CatalogCrawler:
+    """
+    Pages through the catalog (`productList._embedded['app:product']`),
+    fetching up to `concurrency` pages at once. Issues are listed newest
+    first, so crawling stops at the first page that reaches `stop_at`.
+    """
+
+    def __init__(self, url: str, http: HttpCache = None, page_size: int = 30, concurrency: int = 4, max_pages: int = 200, logger: Tamga = None):
+        self.url = url
+        self.http = http or shared_client()
+        self.page_size = page_size
+        self.concurrency = max(1, concurrency)
+        self.max_pages = max_pages
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+
+    def fetch_page(self, page: int):
+        """Products on one catalog page and the total number of pages, if the page says"""
+        r = self.http.get(self.url, params={'page': str(page), 'limit': str(self.page_size)})
+        r.raise_for_status()
+        product_list = extract_page_prop(r.content, 'productList')
+        if not product_list:
+            self.logger.error(f"No product list found on catalog page {page}")
+            return [], None
+        products = product_list.get('_embedded', {}).get('app:product', [])
+        pages = product_list.get('pages')
+        if pages is None and product_list.get('total') is not None:
+            pages = -(-int(product_list['total']) // self.page_size)
+        return products, pages
+
+    def __reached(self, products, stop_at):
+        if stop_at is None:
+            return False
+        versions = (parse_version(p['slug']) for p in products)
+        return any(v is not None and v <= stop_at for v in versions)
+
+    def crawl(self, stop_at: tuple = None):
+        """
+        All products from the newest down to the first page holding an issue
+        at or before stop_at (year, week). With stop_at None every page is read.
+        """
+        products, pages = self.fetch_page(1)
+        collected = list(products)
+        if not products or self.__reached(products, stop_at) or pages == 1:
+            return collected
+
+        last_page = min(pages or self.max_pages, self.max_pages)
+        next_page = 2
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while next_page <= last_page:
+                batch = list(range(next_page, min(next_page + self.concurrency, last_page + 1)))
+                next_page = batch[-1] + 1
+                results = list(pool.map(self.fetch_page, batch))
+                done = False
+                for page_products, _ in results:
+                    if not page_products:
+                        done = True
+                        break
+                    collected.extend(page_products)
+                    if self.__reached(page_products, stop_at):
+                        done = True
+                        break
+                if done:
+                    break
+        self.logger.debug(f"Crawled {len(collected)} catalog products")
+        return collected
+
+    def backfill(self, index, start: tuple, end: tuple):
+        """Slugs of catalog issues between start and end (year, week) that the library index is missing"""
+        products = self.crawl(stop_at=(start[0], start[1] - 1))
+        missing = []
+        found = set()
+        for product in products:
+            version = parse_version(product['slug'])
+            if not version or not (start <= version <= end):
+                continue
+            found.add(version)
+            if not index.has_version(*version) and not index.is_published(product['slug']):
+                missing.append(product['slug'])
+        missing.sort(key=parse_version)
+        self.logger.info(f"Backfill {start}..{end}: {len(found)} issues in the catalog, {len(missing)} missing locally")
+        return missing
@@ -0,0 +1,78 @@
+import json
+import os
+import time
+import zipfile
+from file_transfer import write_atomic
+
+
+STAGES = ('metadata-fetched', 'downloaded', 'extracted', 'merged', 'published')
+
+
+class IssueCheckpoint:
+    """
+    Persisted progress of one issue through the pipeline stages, kept as
+    `checkpoint.json` in the issue's working folder together with the
+    artifacts each stage produced, so a restart resumes after the last stage
+    whose artifacts still verify.
+    """
+
+    def __init__(self, directory: str, slug: str):
+        self.directory = directory
+        self.slug = slug
+        self.path = os.path.join(directory, 'checkpoint.json')
+        self.state = self.__load()
+
+    def __load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('slug') == self.slug and state.get('stage') in STAGES:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {'slug': self.slug, 'stage': None, 'artifacts': {}}
+
+    @property
+    def stage(self):
+        return self.state['stage']
+
+    @property
+    def artifacts(self):
+        return self.state['artifacts']
+
+    def reached(self, stage: str):
+        return self.stage is not None and STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def advance(self, stage: str, **artifacts):
+        self.state['stage'] = stage
+        self.state['artifacts'].update(artifacts)
+        self.state['updated_at'] = time.time()
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(self.path, json.dumps(self.state))
+
+    def verify(self, stage: str):
+        """True when the stage was completed and its artifacts are still intact"""
+        if not self.reached(stage):
+            return False
+        artifacts = self.artifacts
+        if stage == 'downloaded':
+            archive = artifacts.get('archive')
+            return bool(
+                archive
+                and os.path.exists(archive)
+                and not os.path.exists(archive + '.part')
+                and os.path.getsize(archive) == artifacts.get('archive_size')
+                and zipfile.is_zipfile(archive)
+            )
+        if stage == 'extracted':
+            extracted_dir = artifacts.get('extracted_dir')
+            files = artifacts.get('extracted_files') or []
+            return bool(
+                extracted_dir
+                and files
+                and all(os.path.exists(os.path.join(extracted_dir, name)) for name in files)
+            )
+        if stage == 'merged':
+            output = artifacts.get('output')
+            return bool(output and os.path.exists(output) and os.path.getsize(output) == artifacts.get('output_size'))
+        return True
@@ -0,0 +1,124 @@
+import hashlib
+import threading
+
+
+LEAF_SIZE = 4 * 1024 * 1024
+
+
+def _combine(size: int, leaves: list):
+    root = hashlib.blake2b(digest_size=32, person=b'respekt-tree')
+    root.update(size.to_bytes(8, 'big'))
+    for leaf in leaves:
+        root.update(leaf)
+    return root.hexdigest()
+
+
+class TreeHash:
+    """
+    BLAKE2b of a file over fixed LEAF_SIZE leaves: every leaf is hashed on
+    its own and the result hashes the size and the leaf digests. Leaves can
+    be fed in any order, so parallel download segments that start on a leaf
+    boundary hash their bytes as they arrive, and the digest does not depend
+    on how the download was split.
+    """
+
+    def __init__(self, size: int, leaves: dict = None):
+        self.size = size
+        self.count = max(1, -(-size // LEAF_SIZE))
+        self.leaves = {int(k): bytes.fromhex(v) for k, v in (leaves or {}).items()}
+        self._partial = {}
+        self._lock = threading.Lock()
+
+    def __leaf_length(self, index):
+        return min(LEAF_SIZE, self.size - index * LEAF_SIZE)
+
+    def update(self, offset: int, data: bytes):
+        """Feed bytes written at offset; within one leaf bytes must come in order"""
+        view = memoryview(data)
+        while view:
+            index = offset // LEAF_SIZE
+            position = offset - index * LEAF_SIZE
+            piece = view[:LEAF_SIZE - position]
+            with self._lock:
+                if index in self.leaves:
+                    hasher = None
+                else:
+                    hasher, filled = self._partial.get(index, (None, 0))
+                    if hasher is None and position == 0:
+                        hasher = hashlib.blake2b(digest_size=32)
+                    if hasher is not None and filled != position:
+                        hasher = None
+                        self._partial.pop(index, None)
+            if hasher is not None:
+                hasher.update(piece)
+                with self._lock:
+                    filled = position + len(piece)
+                    if filled == self.__leaf_length(index):
+                        self.leaves[index] = hasher.digest()
+                        self._partial.pop(index, None)
+                    else:
+                        self._partial[index] = (hasher, filled)
+            offset += len(piece)
+            view = view[len(piece):]
+
+    def catch_up(self, f, offset: int):
+        """Before resuming at offset, re-read the start of its leaf from the open file f"""
+        start = offset - offset % LEAF_SIZE
+        index = offset // LEAF_SIZE
+        with self._lock:
+            if offset == start or index in self.leaves or self._partial.get(index, (None, 0))[1] == offset - start:
+                return
+            self._partial.pop(index, None)
+        f.seek(start)
+        self.update(start, f.read(offset - start))
+
+    def completed(self):
+        """Hex digests of finished leaves, to be stored with download progress"""
+        with self._lock:
+            return {str(k): v.hex() for k, v in self.leaves.items()}
+
+    def hexdigest(self):
+        """The file digest, or None while some leaf is missing"""
+        with self._lock:
+            if len(self.leaves) < self.count and self.size:
+                return None
+            return _combine(self.size, [self.leaves[i] for i in range(self.count) if i in self.leaves])
+
+
+class StreamHash:
+    """TreeHash of bytes that arrive in order, for streams of unknown length"""
+
+    def __init__(self):
+        self.size = 0
+        self.leaves = []
+        self._leaf = hashlib.blake2b(digest_size=32)
+        self._filled = 0
+
+    def update(self, data: bytes):
+        view = memoryview(data)
+        while view:
+            piece = view[:LEAF_SIZE - self._filled]
+            self._leaf.update(piece)
+            self._filled += len(piece)
+            self.size += len(piece)
+            view = view[len(piece):]
+            if self._filled == LEAF_SIZE:
+                self.leaves.append(self._leaf.digest())
+                self._leaf = hashlib.blake2b(digest_size=32)
+                self._filled = 0
+
+    def hexdigest(self):
+        leaves = self.leaves + ([self._leaf.digest()] if self._filled else [])
+        return _combine(self.size, leaves)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024):
+    """The same digest computed by reading a finished file"""
+    digest = StreamHash()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,84 @@
+import json
+import os
+import time
+import requests
+from requests.cookies import create_cookie
+from tamga import Tamga
+from file_transfer import write_atomic
+
+
+PROBE_URL = 'https://audioteka.com/cz/v2/me'
+
+
+class CookieCache:
+    """
+    Keeps the Audioteka session cookies in a file readable only by the owner,
+    so a browser login is needed only once the stored session stops working.
+    """
+
+    def __init__(self, path: str, probe_url: str = PROBE_URL, logger: Tamga = None):
+        self.path = path
+        self.probe_url = probe_url
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not read cookie cache {self.path}: {e}")
+            return None
+
+        now = time.time()
+        cookies = []
+        for item in data.get('cookies', []):
+            if item.get('expires') and item['expires'] < now:
+                continue
+            cookies.append(create_cookie(
+                item['name'],
+                item['value'],
+                domain=item.get('domain', ''),
+                path=item.get('path', '/'),
+                secure=item.get('secure', False),
+                expires=item.get('expires'),
+                rest=item.get('rest') or {},
+            ))
+        if not cookies:
+            self.logger.info("All cached cookies have expired")
+            return None
+        return cookies
+
+    def save(self, cookies):
+        data = {
+            'saved_at': time.time(),
+            'cookies': [
+                {
+                    'name': c.name,
+                    'value': c.value,
+                    'domain': c.domain,
+                    'path': c.path,
+                    'secure': c.secure,
+                    'expires': c.expires,
+                    'rest': getattr(c, '_rest', {}),
+                }
+                for c in cookies
+            ],
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        write_atomic(self.path, json.dumps(data), mode=0o600)
+        self.logger.debug(f"Saved {len(cookies)} cookies to {self.path}")
+
+    def is_valid(self, cookies):
+        """Cheap authenticated request telling whether the cookies still log us in"""
+        session = requests.Session()
+        for cookie in cookies:
+            session.cookies.set_cookie(cookie)
+        try:
+            r = session.get(self.probe_url, allow_redirects=False, timeout=15)
+        except requests.exceptions.RequestException as e:
+            self.logger.warning(f"Session probe failed: {e}")
+            return False
+        return r.status_code == 200
@@ -1,19 +1,41 @@
 import nodriver as uc
+import asyncio
 import time
 from tamga import Tamga
 import json
+from cookie_cache import CookieCache, PROBE_URL
+
+
+LOGIN_URL = 'https://audioteka.com/cz/prihlaseni/?redirectTo=%2Fcz%2Fpolicka%2F'
+LOGGED_IN_PATH = '/cz/policka/'
+
+BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*clarity.ms*',
+]
 
 
 class SessionCookieManager:
     
-    def __init__(self, headless: bool = False, logger: Tamga = None):
+    def __init__(self, headless: bool = False, logger: Tamga = None, block_resources: bool = True, login_timeout: float = 30):
         self.headless = headless
+        self.block_resources = block_resources
+        self.login_timeout = login_timeout
         self.browser = None
         self.logger = logger or Tamga(
             logToFile=False,
             logToJSON=False,
             logToConsole=True
         )
+        self._step_started = None
+
+    def __step(self, name: str):
+        now = time.monotonic()
+        if self._step_started is not None:
+            self.logger.debug(f"Browser step '{name}' took {now - self._step_started:.2f}s")
+        self._step_started = now
     
     async def start_browser(self):
         try:
@@ -23,14 +45,37 @@ class SessionCookieManager:
         except Exception as e:
             self.logger.error(f"Failed to start browser: {e}")
             raise
+
+    def __logged_in(self, page):
+        # The URL from the target info, which the browser keeps up to date;
+        # evaluating JavaScript fails while the redirect replaces the page
+        url = page.target.url if page.target else None
+        return bool(url and LOGGED_IN_PATH in url)
+
+    async def __wait_for_login(self, page):
+        deadline = time.monotonic() + self.login_timeout
+        while time.monotonic() < deadline:
+            if self.__logged_in(page):
+                return True
+            await asyncio.sleep(0.1)
+        return False
     
     async def login(self, email: str, password: str):
+        self._step_started = time.monotonic()
         if not self.browser:
             await self.start_browser()
+            self.__step("start browser")
         
         try:
+            page = await self.browser.get('about:blank')
+            if self.block_resources:
+                await page.send(uc.cdp.network.enable())
+                await page.send(uc.cdp.network.set_blocked_ur_ls(urls=BLOCKED_URLS))
+                self.logger.debug("Blocking images, fonts and analytics")
+
             self.logger.info("Navigating to login page")
-            page = await self.browser.get('https://audioteka.com/cz/prihlaseni/?redirectTo=%2Fcz%2Fpolicka%2F')
+            await page.get(LOGIN_URL)
+            self.__step("load login page")
             
             
             self.logger.debug("Looking for cookie consent button")
@@ -38,6 +83,7 @@ class SessionCookieManager:
             if cookie_bar_accept:
                 await cookie_bar_accept.click()
                 self.logger.debug("Cookie consent accepted")
+            self.__step("cookie consent")
             
             
             self.logger.info("Filling login form")
@@ -49,9 +95,12 @@ class SessionCookieManager:
             
             login_button = await page.select("button[type=submit]")
             await login_button.click()
+            self.__step("fill login form")
             
             self.logger.info("Login submitted, waiting for response")
-            time.sleep(2)
+            if not await self.__wait_for_login(page):
+                raise TimeoutError(f"Login did not complete within {self.login_timeout}s")
+            self.__step("wait for login")
             
             
             cookies = await self.browser.cookies.get_all(requests_cookie_format=True)
@@ -66,7 +115,7 @@ class SessionCookieManager:
                 self.logger.info("Closing browser")
                 self.browser.stop()
 
-async def get_cookies(email, password):
+async def get_cookies(email, password, cache_path: str = None, headless: bool = False, login_timeout: float = 30, probe_url: str = PROBE_URL):
     
     
     logger = Tamga(
@@ -74,11 +123,21 @@ async def get_cookies(email, password):
         logToJSON=True,
         logToConsole=True
     )
+
+    cache = CookieCache(cache_path, probe_url, logger=logger) if cache_path else None
+    if cache:
+        cookies = cache.load()
+        if cookies and cache.is_valid(cookies):
+            logger.info(f"Reusing {len(cookies)} cached cookies")
+            return cookies
+        logger.info("Cached session is missing or expired, logging in")
     
-    cookie_manager = SessionCookieManager(headless=False, logger=logger)
+    cookie_manager = SessionCookieManager(headless=headless, logger=logger, login_timeout=login_timeout)
     cookies = await cookie_manager.login(email, password)
     
     logger.info(f"Got {len(cookies)} cookies")
+    if cache:
+        cache.save(cookies)
 
     return cookies
 
@@ -1,10 +1,15 @@
 import os
+import shutil
 import subprocess
 import tempfile
-import sys
-import chardet
 from dataclasses import dataclass
 from tamga import Tamga
+from mp3_concat import Mp3Concatenator, build_id3_tag
+from mp3_duration import scan_duration, scan_durations
+from content_hash import hash_file
+from metrics import metrics
+from playlist import EncodingCache, parse_playlist, shared_encoding_cache
+from transcode import PROFILES, ChapterTranscoder, ogg_metadata
 
 @dataclass
 class PodcastData:
@@ -31,86 +36,276 @@ class PodcastData:
         self.description = description
 
 class CreatePodcast:
-    def __init__(self, pd: PodcastData, logger: Tamga =None):
+    def __init__(self, pd: PodcastData, logger: Tamga =None, single_pass: bool = True, backend: str = 'ffmpeg', encoding_cache: EncodingCache = None, consume_sources: bool = False, profile: str = 'mp3', loudnorm: bool = False, workers: int = None):
         self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
         self.pd = pd
+        self.single_pass = single_pass
+        self.backend = backend
+        self.duration_ms = 0
+        self.output_hash = None
+        self.encoding_cache = encoding_cache or shared_encoding_cache()
+        self.consume_sources = consume_sources
+        self.profile = PROFILES.get(profile)
+        if profile != 'mp3' and not self.profile:
+            self.logger.warning(f"Unknown output profile {profile}, keeping MP3")
+        self.loudnorm = loudnorm
+        self.workers = workers
 
-    def __detect_encoding(self, file_path):
-        with open(file_path, 'rb') as f:
-            raw_data = f.read()
-        result = chardet.detect(raw_data)
-        return result['encoding']
-
-    def __parse_pls(self):
+    def __parse_playlist(self):
         self.chapters = []
-                
-        pls_encoding = self.__detect_encoding(self.pd.pls_file)
-        
         try:
-            with open(self.pd.pls_file, 'r', encoding=pls_encoding) as f: 
-                lines = f.readlines()
-        except Exception as e:
-            self.logger.error(f"Could not read PLS file {self.pd.pls_file}: {e}")
+            self.chapters, missing = parse_playlist(self.pd.pls_file, self.encoding_cache)
+        except OSError as e:
+            self.logger.error(f"Could not read playlist {self.pd.pls_file}: {e}")
             return None
-        
-        
-        num_entries_line = next((line for line in lines if line.startswith('NumberOfEntries=')), None)
-        if not num_entries_line:
-            self.logger.error("Invalid PLS file format - missing NumberOfEntries")
-            return None
-        
-        num_entries = int(num_entries_line.split('=')[1].strip())
-        
-        
-        for i in range(1, num_entries + 1):
-            file_prefix = f"File{i}="
-            title_prefix = f"Title{i}="
-            length_prefix = f"Length{i}="
-            
-            file_line = next((line for line in lines if line.startswith(file_prefix)), None)
-            title_line = next((line for line in lines if line.startswith(title_prefix)), None)
-            length_line = next((line for line in lines if line.startswith(length_prefix)), None)
-            
-            if not file_line:
-                self.logger.warning(f"Missing File{i} entry in PLS")
-                continue
-                
-            filename = file_line[len(file_prefix):].strip()
-            
-            
-            if title_line:
-                title = title_line[len(title_prefix):].strip()
-            else:
-                title = os.path.splitext(filename)[0]
-            
-            
-            length = 0
-            if length_line:
-                try:
-                    length = int(length_line[len(length_prefix):].strip()) / 1000
-                except ValueError:
-                    self.logger.warning(f"Invalid length format for {filename}")
-            
-            self.chapters.append({
-                'filename': filename,
-                'title': title,
-                'length': length
-            })
+        for number in missing:
+            self.logger.warning(f"Missing File{number} entry in playlist")
 
     def __check_dependencies(self):
         """Check if FFmpeg is installed"""
         try:
             subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+            return True
         except (subprocess.SubprocessError, FileNotFoundError):
             self.logger.error("FFmpeg is not installed or not in PATH")
-            sys.exit(1)
+            return False
+
+    def __run_ffmpeg(self, stage, args, output_path):
+        args = [args[0], '-y', *args[1:]]
+        with metrics.span(stage) as span:
+            result = subprocess.run(args, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            if os.path.exists(output_path):
+                span['bytes'] = os.path.getsize(output_path)
+        return result
+
+    def __metadata_args(self):
+        metadata_args = []
+        if self.pd.book_title:
+            metadata_args.extend(['-metadata', f'title={self.pd.book_title}'])
+        if self.pd.artist:
+            metadata_args.extend(['-metadata', f'artist={self.pd.artist}'])
+        if self.pd.album:
+            metadata_args.extend(['-metadata', f'album={self.pd.album}'])
+        if self.pd.date:
+            metadata_args.extend(['-metadata', f'date={self.pd.date}'])
+        if self.pd.description:
+            metadata_args.extend(['-metadata', f'comment={self.pd.description}'])
+        return metadata_args
+
+    def __merge_single_pass(self, concat_file, chapters_file, found_chapters):
+        """Concatenate, attach chapters, cover and tags in one FFmpeg run"""
+        self.logger.info(f"Merging {len(self.sources)} audio files with chapter metadata in a single pass...")
+
+        ffmpeg_args = [
+            'ffmpeg',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', concat_file,
+            '-i', chapters_file,
+        ]
+        map_args = ['-map', '0:a', '-map_metadata', '1', '-map_chapters', '1']
+
+        if self.pd.cover_image:
+            if not os.path.exists(self.pd.cover_image):
+                self.logger.warning(f"Cover image not found: {self.pd.cover_image}")
+            else:
+                ffmpeg_args.extend(['-i', self.pd.cover_image])
+                map_args.extend([
+                    '-map', '2',
+                    '-metadata:s:v', 'title=Cover',
+                    '-metadata:s:v', 'comment=Cover (front)',
+                ])
+
+        ffmpeg_args.extend(map_args)
+        ffmpeg_args.extend(['-c', 'copy', '-id3v2_version', '3'])
+        ffmpeg_args.extend(self.__metadata_args())
+        ffmpeg_args.append(self.work_output)
+
+        try:
+            self.__run_ffmpeg('ffmpeg_single_pass', ffmpeg_args, self.work_output)
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Single-pass merge: {e}")
+            self.logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+            return False
+        return True
+
+    def __merge_transcoded(self, chapters_file, found_chapters):
+        """Encode the chapters in parallel with the output profile, then concatenate them losslessly"""
+        encoded_dir = tempfile.mkdtemp(prefix='.encoded-', dir=self.pd.folder_path)
+        try:
+            transcoder = ChapterTranscoder(self.profile, self.workers, self.loudnorm, self.logger)
+            try:
+                with metrics.span(f'transcode_{self.profile.name}') as span:
+                    encoded = transcoder.transcode(self.sources, encoded_dir, self.consume_sources)
+                    span['bytes'] = sum(os.path.getsize(path) for path in encoded)
+            except (subprocess.CalledProcessError, RuntimeError) as e:
+                self.logger.error(f"Encoding chapters failed: {e}")
+                if isinstance(e, subprocess.CalledProcessError):
+                    self.logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+                return False
+
+            self.logger.info(f"Joining {len(encoded)} encoded files with {found_chapters} chapters...")
+            concat_file = os.path.join(encoded_dir, 'concat.txt')
+            with open(concat_file, 'w', encoding='utf-8') as f:
+                f.writelines(f"file '{path}'\n" for path in encoded)
+
+            cover_path = self.pd.cover_image
+            if cover_path and not os.path.exists(cover_path):
+                self.logger.warning(f"Cover image not found: {cover_path}")
+                cover_path = None
+
+            map_args = ['-map', '0:a', '-map_metadata', '1', '-map_chapters', '1']
+            if self.profile.extension == '.opus':
+                with open(chapters_file, 'r', encoding='utf-8') as f:
+                    metadata = ogg_metadata(f.read(), self.chapter_marks, cover_path)
+                chapters_file = os.path.join(encoded_dir, 'metadata.txt')
+                with open(chapters_file, 'w', encoding='utf-8') as f:
+                    f.write(metadata)
+                map_args = ['-map', '0:a', '-map_metadata', '1', '-map_chapters', '-1']
+                cover_path = None
+
+            ffmpeg_args = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', concat_file, '-i', chapters_file]
+            if cover_path:
+                ffmpeg_args.extend(['-i', cover_path])
+                map_args.extend(['-map', '2', '-disposition:v:0', 'attached_pic'])
+            ffmpeg_args.extend(map_args)
+            ffmpeg_args.extend(['-c', 'copy'])
+            if self.profile.extension == '.m4b':
+                ffmpeg_args.extend(['-movflags', '+faststart'])
+            ffmpeg_args.extend(self.__metadata_args())
+            ffmpeg_args.append(self.work_output)
+
+            try:
+                self.__run_ffmpeg('ffmpeg_join_encoded', ffmpeg_args, self.work_output)
+            except subprocess.CalledProcessError as e:
+                self.logger.error(f"Joining encoded chapters: {e}")
+                self.logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+                return False
+            return True
+        finally:
+            shutil.rmtree(encoded_dir, ignore_errors=True)
+
+    def __verify_output(self):
+        """Check the merged MP3 is not shorter than its chapters add up to, and hash it"""
+        if not self.profile:
+            scanned = scan_duration(self.work_output)
+            if not scanned:
+                self.logger.error(f"No audio found in merged file: {self.work_output}")
+                return False
+            difference = scanned['duration_ms'] - self.duration_ms
+            tolerance = max(2000, self.duration_ms * 0.01)
+            if difference < -tolerance:
+                self.logger.error(f"Merged file is {-difference / 1000:.1f}s shorter than its chapters")
+                return False
+            if difference > tolerance:
+                self.logger.warning(f"Merged file is {difference / 1000:.1f}s longer than its chapters")
+        self.output_hash = hash_file(self.work_output)
+        return True
+
+    def __merge_native(self, found_chapters):
+        """Concatenate MPEG frames in-process and write an ID3v2.3 tag with CHAP/CTOC frames"""
+        self.logger.info(f"Merging {len(self.sources)} audio files with the native MP3 concatenator...")
+
+        cover_path = self.pd.cover_image
+        if cover_path and not os.path.exists(cover_path):
+            self.logger.warning(f"Cover image not found: {cover_path}")
+            cover_path = None
+
+        try:
+            tag = build_id3_tag(
+                self.chapter_marks,
+                title=self.pd.book_title,
+                artist=self.pd.artist,
+                album=self.pd.album,
+                date=self.pd.date,
+                comment=self.pd.description,
+                cover_path=cover_path,
+            )
+        except ValueError as e:
+            self.logger.error(f"Native merge can't write the chapters: {e}")
+            return False
+        try:
+            with metrics.span('native_merge') as span:
+                span['bytes'] = Mp3Concatenator(self.logger).concat(self.sources, self.work_output, tag, consume=self.consume_sources)
+        except OSError as e:
+            self.logger.error(f"Native merge failed: {e}")
+            return False
+        return True
+
+    def __merge_two_pass(self, temp_dir, concat_file, chapters_file, found_chapters):
+        """Concatenate into a temporary file, then add chapters, cover and tags"""
+        temp_output = os.path.join(temp_dir, "temp_merged.mp3")
+
+        self.logger.info(f"Merging {len(self.sources)} audio files...")
+
+        try:
+            result = self.__run_ffmpeg('ffmpeg_concat', [
+                'ffmpeg',
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', concat_file,
+                '-c', 'copy',
+                temp_output
+            ], temp_output)
+            if result.returncode != 0:
+                print(f"FFmpeg error during concatenation: {result.stderr.decode('utf-8', 'ignore')}")
+                return False
+        except subprocess.CalledProcessError as e:
+            print(f"Error during FFmpeg concatenation: {e}")
+            print(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+            return False
+
+        self.logger.info("Adding chapter metadata...")
+
+        ffmpeg_args = [
+            'ffmpeg',
+            '-i', temp_output,
+            '-i', chapters_file,
+            '-map_metadata', '1',
+            '-codec', 'copy',
+        ]
+
+        if self.pd.cover_image:
+            if not os.path.exists(self.pd.cover_image):
+                self.logger.warning(f"Cover image not found: {self.pd.cover_image}")
+            else:
+                ffmpeg_args = [
+                    'ffmpeg',
+                    '-i', temp_output,       
+                    '-i', chapters_file,     
+                    '-i', self.pd.cover_image,       
+                    '-map', '0',             
+                    '-map_metadata', '1',    
+                    '-map', '2',             
+                    '-c', 'copy',
+                    '-id3v2_version', '3',
+                    '-metadata:s:v', 'title=Cover',
+                    '-metadata:s:v', 'comment=Cover (front)',
+                ]
+        ffmpeg_args.extend(self.__metadata_args())
+        ffmpeg_args.append(self.work_output)
+
+        try:
+            result = self.__run_ffmpeg('ffmpeg_metadata', ffmpeg_args, self.work_output)
+            if result.returncode != 0:
+                self.logger.error(f"FFmpeg error adding metadata: {result.stderr.decode('utf-8', 'ignore')}")
+                return False
+        except subprocess.CalledProcessError as e:
+            self.logger.error(f"Adding chapter metadata: {e}")
+            self.logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+            return False
+        return True
 
     def make(self):
         """
         Merge multiple audiobook MP3 files into one, preserving chapter markers
-        based on a PLS playlist file.  Handles more metadata and cover art.
+        based on a PLS, M3U or CUE playlist.  Handles more metadata and cover art.
+        The result is written under a hidden name of its own next to output_path
+        and renamed into place, so output_path can be the final destination and
+        several processes merging the same issue never write to the same file.
         """
-        self.__check_dependencies()
+        if (self.backend == 'ffmpeg' or self.profile) and not self.__check_dependencies():
+            return False
         self.logger.info("Starting audiobook creation process...")
 
         self.pd.folder_path = os.path.abspath(self.pd.folder_path)
@@ -119,19 +314,21 @@ class CreatePodcast:
             return False
         
         if not os.path.exists(self.pd.pls_file):
-            self.logger.error(f"PLS file not found: {self.pd.pls_file}")
+            self.logger.error(f"Playlist not found: {self.pd.pls_file}")
             return False
         
         if self.pd.output_path is None:
             folder_name = os.path.basename(self.pd.folder_path.rstrip('/\\'))
             self.pd.output_path = os.path.join(os.path.dirname(self.pd.folder_path), f"{folder_name}_merged.mp3")
-        
-        self.__parse_pls()
+        if self.profile:
+            self.pd.output_path = os.path.splitext(self.pd.output_path)[0] + self.profile.extension
+
+        self.__parse_playlist()
         if not self.chapters:
-            self.logger.error("Could not parse chapters from PLS file")
+            self.logger.error("Could not parse chapters from playlist")
             return False
         
-        self.logger.success(f"Found {len(self.chapters)} chapters in PLS file")
+        self.logger.success(f"Found {len(self.chapters)} chapters in playlist")
         
         with tempfile.TemporaryDirectory() as temp_dir:
 
@@ -160,6 +357,17 @@ class CreatePodcast:
             
             found_chapters = 0
             current_time_ms = 0
+            file_start_ms = 0
+            self.chapter_marks = []
+            self.sources = []
+
+            unknown_lengths = list(dict.fromkeys(
+                os.path.join(self.pd.folder_path, chapter['filename'])
+                for chapter in self.chapters
+                if chapter['length'] <= 0 and os.path.exists(os.path.join(self.pd.folder_path, chapter['filename']))
+            ))
+            with metrics.span('duration_probe'):
+                scanned = scan_durations(unknown_lengths)
             
             for idx, chapter in enumerate(self.chapters):
                 self.logger.info(f"Processing chapter {idx+1}: {chapter['title']}")
@@ -168,13 +376,34 @@ class CreatePodcast:
                 if not os.path.exists(file_path):
                     self.logger.warning(f"File not found: {file_path}")
                     continue
-                
+
+                offset_ms = chapter.get('offset', 0) * 1000
+                if offset_ms > 0 and self.sources and self.sources[-1] == file_path:
+                    # Another track of the file added last, as in a CUE sheet of one file
+                    previous = self.chapter_marks[-1]
+                    start_ms = round(file_start_ms + offset_ms)
+                    if previous['end_ms'] <= start_ms:
+                        self.logger.warning(f"Track {chapter['title']} starts past the known end of {chapter['filename']}, skipped")
+                        continue
+                    self.chapter_marks.append({
+                        'path': file_path,
+                        'title': chapter['title'],
+                        'start_ms': start_ms,
+                        'end_ms': previous['end_ms'],
+                    })
+                    previous['end_ms'] = start_ms
+                    found_chapters += 1
+                    continue
+
                 with open(concat_file, 'a', encoding='utf-8') as f:
                     f.write(f"file '{file_path}'\n")
+                self.sources.append(file_path)
                 
                 duration_ms = chapter['length'] * 1000 if chapter['length'] > 0 else 0
                 
-                if duration_ms == 0:
+                if duration_ms == 0 and scanned.get(file_path):
+                    duration_ms = scanned[file_path]['duration_ms']
+                elif duration_ms == 0:
                     try:
                         result = subprocess.run([
                             'ffprobe',
@@ -184,107 +413,74 @@ class CreatePodcast:
                             file_path
                         ], capture_output=True, text=True)
                         if result.returncode != 0:
-                            self.logger.info(f"FFprobe error for {chapter['filename']}: {result.stderr.decode('utf-8', 'ignore')}")
+                            self.logger.info(f"FFprobe error for {chapter['filename']}: {result.stderr}")
                             duration_ms = 0
                         else:
                             duration_sec = float(result.stdout.strip())
-                            duration_ms = int(duration_sec * 1000)
-                    except (subprocess.SubprocessError, ValueError) as e:
+                            duration_ms = duration_sec * 1000
+                    except (subprocess.SubprocessError, FileNotFoundError, ValueError) as e:
                         self.logger.warning(f"Could not determine duration for {chapter['filename']}: {e}")
                         duration_ms = 0
                 
                 start_ms = current_time_ms
+                file_start_ms = start_ms
                 end_ms = start_ms + duration_ms if duration_ms > 0 else 0
-                
-                with open(chapters_file, 'a', encoding='utf-8') as f:
-                    f.write("[CHAPTER]\n")
-                    f.write("TIMEBASE=1/1000\n")
-                    f.write(f"START={start_ms}\n")
-                    
-                    if end_ms > start_ms:
-                        f.write(f"END={end_ms}\n")
-                        current_time_ms = end_ms
-                    
-                    f.write(f"title={chapter['title']}\n\n")
-                
+                if end_ms > start_ms:
+                    current_time_ms = end_ms
+
+                self.chapter_marks.append({
+                    'path': file_path,
+                    'title': chapter['title'],
+                    'start_ms': round(start_ms),
+                    'end_ms': round(end_ms if end_ms > start_ms else start_ms),
+                })
                 found_chapters += 1
             
             if found_chapters == 0:
                 self.logger.error("No valid chapter files found")
                 return False
-            
-            temp_output = os.path.join(temp_dir, "temp_merged.mp3")
-            
-            self.logger.info(f"Merging {found_chapters} audio files...")
-            
-            try:
-                result = subprocess.run([
-                    'ffmpeg',
-                    '-f', 'concat',
-                    '-safe', '0',
-                    '-i', concat_file,
-                    '-c', 'copy',
-                    temp_output
-                ], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                if result.returncode != 0:
-                    print(f"FFmpeg error during concatenation: {result.stderr.decode('utf-8', 'ignore')}")
-                    return False
-            except subprocess.CalledProcessError as e:
-                print(f"Error during FFmpeg concatenation: {e}")
-                print(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
-                return False
-            
-            self.logger.info("Adding chapter metadata...")
-            
-            ffmpeg_args = [
-                'ffmpeg',
-                '-i', temp_output,
-                '-i', chapters_file,
-                '-map_metadata', '1',
-                '-codec', 'copy',
-            ]
-
-            if self.pd.cover_image:
-                if not os.path.exists(self.pd.cover_image):
-                    self.logger.warning(f"Cover image not found: {self.pd.cover_image}")
-                else:
-                    ffmpeg_args = [
-                        'ffmpeg',
-                        '-i', temp_output,       
-                        '-i', chapters_file,     
-                        '-i', self.pd.cover_image,       
-                        '-map', '0',             
-                        '-map_metadata', '1',    
-                        '-map', '2',             
-                        '-c', 'copy',
-                        '-id3v2_version', '3',
-                        '-metadata:s:v', 'title=Cover',
-                        '-metadata:s:v', 'comment=Cover (front)',
-                    ]
-            metadata_args = []
-            if self.pd.book_title:
-                metadata_args.extend(['-metadata', f'title={self.pd.book_title}'])
-            if self.pd.artist:
-                metadata_args.extend(['-metadata', f'artist={self.pd.artist}'])
-            if self.pd.album:
-                metadata_args.extend(['-metadata', f'album={self.pd.album}'])
-            if self.pd.date:
-                metadata_args.extend(['-metadata', f'date={self.pd.date}'])
-            if self.pd.description:
-                metadata_args.extend(['-metadata', f'comment={self.pd.description}'])
-            ffmpeg_args.extend(metadata_args)
-            ffmpeg_args.append(self.pd.output_path)
-            
-            try:
-                result = subprocess.run(ffmpeg_args, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                if result.returncode != 0:
-                    self.logger.error(f"FFmpeg error adding metadata: {result.stderr.decode('utf-8', 'ignore')}")
-                    return False
-            except subprocess.CalledProcessError as e:
-                self.logger.error(f"Adding chapter metadata: {e}")
-                self.logger.error(f"FFmpeg stderr: {e.stderr.decode('utf-8', 'ignore')}")
+            self.duration_ms = current_time_ms
+
+            with open(chapters_file, 'a', encoding='utf-8') as f:
+                for mark in self.chapter_marks:
+                    f.write("[CHAPTER]\n")
+                    f.write("TIMEBASE=1/1000\n")
+                    f.write(f"START={mark['start_ms']}\n")
+                    if mark['end_ms'] > mark['start_ms']:
+                        f.write(f"END={mark['end_ms']}\n")
+                    f.write(f"title={mark['title']}\n\n")
+
+            output_root, output_ext = os.path.splitext(os.path.basename(self.pd.output_path))
+            fd, self.work_output = tempfile.mkstemp(
+                prefix=f".{output_root}.",
+                suffix=f".partial{output_ext}",
+                dir=os.path.dirname(os.path.abspath(self.pd.output_path)),
+            )
+            os.close(fd)
+
+            if self.profile:
+                merged = self.__merge_transcoded(chapters_file, found_chapters)
+            elif self.backend == 'native':
+                merged = self.__merge_native(found_chapters)
+            elif self.single_pass:
+                merged = self.__merge_single_pass(concat_file, chapters_file, found_chapters)
+                if not merged:
+                    self.logger.warning("Single-pass merge failed, falling back to two-pass merge")
+                    if os.path.exists(self.work_output):
+                        os.remove(self.work_output)
+                    merged = self.__merge_two_pass(temp_dir, concat_file, chapters_file, found_chapters)
+            else:
+                merged = self.__merge_two_pass(temp_dir, concat_file, chapters_file, found_chapters)
+            if not merged or not self.__verify_output():
+                if os.path.exists(self.work_output):
+                    os.remove(self.work_output)
                 return False
-        
+
+        os.replace(self.work_output, self.pd.output_path)
+        if self.consume_sources and self.backend != 'native':
+            for path in self.sources:
+                if os.path.exists(path):
+                    os.remove(path)
         self.logger.success(f"Successfully created audiobook with {found_chapters} chapters: {self.pd.output_path}")
         return True
 
@@ -0,0 +1,82 @@
+import signal
+import threading
+from datetime import datetime, timezone
+from statistics import median
+from tamga import Tamga
+
+
+MINUTES_PER_WEEK = 7 * 24 * 60
+
+
+def _minute_of_week(dt: datetime):
+    dt = dt.astimezone(timezone.utc)
+    return dt.weekday() * 24 * 60 + dt.hour * 60 + dt.minute
+
+
+class ReleaseSchedule:
+    """
+    Expected weekly release time learned from past `created_at` timestamps:
+    the most common weekday and the median time of day on it.
+    """
+
+    def __init__(self, release_times: list, window_hours: float = 6, min_samples: int = 3):
+        self.window = int(window_hours * 60)
+        self.expected = None
+        minutes = [_minute_of_week(t) for t in release_times]
+        if len(minutes) < min_samples:
+            return
+        weekdays = [m // (24 * 60) for m in minutes]
+        weekday = max(set(weekdays), key=weekdays.count)
+        self.expected = int(median(m for m in minutes if m // (24 * 60) == weekday))
+
+    def next_interval(self, now: datetime, fast: float, slow: float, default: float):
+        """Seconds until the next check: `fast` inside the release window, otherwise up to `slow`"""
+        if self.expected is None:
+            return default
+        current = _minute_of_week(now)
+        distance = (current - self.expected) % MINUTES_PER_WEEK
+        distance = min(distance, MINUTES_PER_WEEK - distance)
+        if distance <= self.window:
+            return fast
+        until_window = (self.expected - self.window - current) % MINUTES_PER_WEEK
+        return max(fast, min(slow, until_window * 60))
+
+
+class Daemon:
+    """
+    Calls `poll(stop_event)` repeatedly, sleeping as the release schedule
+    suggests. SIGTERM/SIGINT set the stop event, so the current poll can
+    finish the item in progress and no new work is started.
+    """
+
+    def __init__(self, poll, release_times, fast_interval: float = 900, slow_interval: float = 6 * 3600, default_interval: float = 3600, window_hours: float = 6, logger: Tamga = None):
+        self.poll = poll
+        self.release_times = release_times
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.default_interval = default_interval
+        self.window_hours = window_hours
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self.stop_event = threading.Event()
+
+    def stop(self, signum=None, frame=None):
+        if not self.stop_event.is_set():
+            self.logger.info("Shutdown requested, finishing current work")
+        self.stop_event.set()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self.logger.info("Daemon started")
+        while not self.stop_event.is_set():
+            try:
+                self.poll(self.stop_event)
+            except Exception as e:
+                self.logger.error(f"Poll failed: {e}")
+            if self.stop_event.is_set():
+                break
+            schedule = ReleaseSchedule(self.release_times(), self.window_hours)
+            interval = schedule.next_interval(datetime.now(timezone.utc), self.fast_interval, self.slow_interval, self.default_interval)
+            self.logger.info(f"Next check in {interval / 60:.0f} minutes")
+            self.stop_event.wait(interval)
+        self.logger.info("Daemon stopped")
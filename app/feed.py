@@ -0,0 +1,146 @@
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+from tamga import Tamga
+from file_transfer import file_lock, write_atomic
+
+
+FEED_HEADER = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
+<channel>
+<title>{title}</title>
+<link>{link}</link>
+<description>{description}</description>
+<language>cs</language>
+{image}</channel>
+</rss>
+"""
+
+MIME_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.m4b': 'audio/mp4',
+    '.m4a': 'audio/mp4',
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg',
+}
+
+
+def _duration(ms):
+    seconds = int(round(ms / 1000))
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+ITEM_DATE = re.compile(r'<item>(?:(?!</item>).)*?<pubDate>(.*?)</pubDate>', re.S)
+
+
+def _pub_datetime(value):
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value))
+        except ValueError:
+            dt = datetime.now(timezone.utc)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.replace(microsecond=0)
+
+
+def _pub_date(value):
+    return format_datetime(_pub_datetime(value))
+
+
+class PodcastFeed:
+    """
+    Podcast RSS feed maintained incrementally: each published issue is
+    inserted as a new <item> in front of the first older one by pubDate, so
+    the feed stays newest first whatever order issues are published in. The
+    existing items are kept byte for byte, so nothing has to rescan the
+    folder or reread ID3 tags. Each change holds a file lock next to the
+    feed, so instances sharing the folder don't lose each other's items.
+    """
+
+    def __init__(self, path: str, base_url: str, title: str = 'Respekt', link: str = 'https://www.respekt.cz/', description: str = 'Respekt audio', image_url: str = None, logger: Tamga = None):
+        self.path = path
+        self.base_url = base_url.rstrip('/') + '/'
+        self.title = title
+        self.link = link
+        self.description = description
+        self.image_url = image_url
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self._lock = threading.Lock()
+        self.lock_path = os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.lock")
+
+    def __header(self):
+        image = f"<itunes:image href={quoteattr(self.image_url)}/>\n" if self.image_url else ''
+        return FEED_HEADER.format(
+            title=escape(self.title),
+            link=escape(self.link),
+            description=escape(self.description),
+            image=image,
+        )
+
+    def __item(self, guid, pd, file_path, duration_ms, image_url):
+        name = os.path.basename(file_path)
+        mime = MIME_TYPES.get(os.path.splitext(name)[1].lower(), 'application/octet-stream')
+        lines = [
+            "<item>",
+            f"<title>{escape(pd.book_title or name)}</title>",
+            f"<guid isPermaLink=\"false\">{escape(guid)}</guid>",
+            f"<pubDate>{_pub_date(pd.date)}</pubDate>",
+            f"<enclosure url={quoteattr(self.base_url + quote(name))} length=\"{os.path.getsize(file_path)}\" type=\"{mime}\"/>",
+        ]
+        if pd.description:
+            lines.append(f"<description>{escape(pd.description)}</description>")
+        if pd.artist:
+            lines.append(f"<itunes:author>{escape(pd.artist)}</itunes:author>")
+        if duration_ms:
+            lines.append(f"<itunes:duration>{_duration(duration_ms)}</itunes:duration>")
+        if image_url:
+            lines.append(f"<itunes:image href={quoteattr(image_url)}/>")
+        lines.append("</item>")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def __position(content, date):
+        """Offset of the first item published before date, or of </channel> when there is none"""
+        for match in ITEM_DATE.finditer(content):
+            try:
+                if parsedate_to_datetime(match.group(1)) < date:
+                    return match.start()
+            except (TypeError, ValueError):
+                continue
+        return content.rfind('</channel>')
+
+    def add_item(self, guid: str, pd, file_path: str, duration_ms: float = None, image_url: str = None):
+        """Insert an item for a published file; an item with the same guid is not added twice"""
+        return self.add_items([(guid, pd, file_path, duration_ms, image_url)]) == 1
+
+    def add_items(self, items: list):
+        """Insert (guid, pd, file_path, duration_ms, image_url) items in one update; returns how many were new"""
+        added = []
+        with self._lock, file_lock(self.lock_path):
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            else:
+                content = self.__header()
+
+            for guid, pd, file_path, duration_ms, image_url in items:
+                if f">{escape(guid)}</guid>" in content:
+                    self.logger.debug(f"Feed already has {guid}")
+                    continue
+                item = self.__item(guid, pd, file_path, duration_ms, image_url)
+                position = self.__position(content, _pub_datetime(pd.date))
+                content = content[:position] + item + content[position:]
+                added.append(guid)
+
+            if added:
+                write_atomic(self.path, content)
+        for guid in added:
+            self.logger.info(f"Added {guid} to feed: {self.path}")
+        return len(added)
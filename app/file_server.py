@@ -0,0 +1,128 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+from tamga import Tamga
+
+
+CONTENT_TYPES = {
+    '.xml': 'application/rss+xml; charset=utf-8',
+    '.mp3': 'audio/mpeg',
+    '.m4b': 'audio/mp4',
+    '.m4a': 'audio/mp4',
+    '.opus': 'audio/ogg',
+    '.ogg': 'audio/ogg',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+}
+
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves files from `root` with single byte-range support, using sendfile
+    for the body. A Range header it can't serve as one range, such as a
+    multi-range request, is ignored and the whole file is sent (RFC 9110).
+    """
+
+    root = None
+    logger = None
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.logger:
+            self.logger.debug(f"{self.address_string()} {format % args}")
+
+    def __resolve(self):
+        name = unquote(urlparse(self.path).path).lstrip('/')
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(os.path.realpath(self.root) + os.sep) or not os.path.isfile(path):
+            return None
+        if os.path.basename(path).startswith('.'):
+            return None
+        return path
+
+    def __send_error(self, code):
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def __serve(self, head: bool):
+        path = self.__resolve()
+        if not path:
+            return self.__send_error(404)
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get('Range')
+        match = RANGE_PATTERN.match(range_header.strip()) if range_header else None
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start > end or start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+
+        length = end - start + 1
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream'))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(length))
+        self.send_header('Last-Modified', self.date_time_string(int(os.path.getmtime(path))))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+        if head or length == 0:
+            return
+
+        self.wfile.flush()
+        with open(path, 'rb') as f:
+            offset = start
+            remaining = length
+            try:
+                while remaining > 0:
+                    sent = os.sendfile(self.connection.fileno(), f.fileno(), offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+            except (AttributeError, OSError):
+                f.seek(offset)
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 256 * 1024))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    def do_GET(self):
+        try:
+            self.__serve(head=False)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_HEAD(self):
+        self.__serve(head=True)
+
+
+def make_server(root: str, host: str = '0.0.0.0', port: int = 8080, logger: Tamga = None):
+    handler = type('FeedRequestHandler', (RangeRequestHandler,), {'root': root, 'logger': logger})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve_in_background(root: str, host: str = '0.0.0.0', port: int = 8080, logger: Tamga = None):
+    server = make_server(root, host, port, logger)
+    thread = threading.Thread(target=server.serve_forever, name='file-server', daemon=True)
+    thread.start()
+    return server
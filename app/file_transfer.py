@@ -0,0 +1,136 @@
+import errno
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+FICLONE = 0x40049409
+
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def copy_range(in_fd, out_fd, offset, count):
+    """Copy count bytes from offset of in_fd to the position of out_fd, in the kernel when possible"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while count > 0:
+                copied = os.copy_file_range(in_fd, out_fd, count, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                count -= copied
+            if count == 0:
+                return
+        except OSError:
+            pass
+    if hasattr(os, 'sendfile'):
+        try:
+            while count > 0:
+                sent = os.sendfile(out_fd, in_fd, offset, count)
+                if sent == 0:
+                    break
+                offset += sent
+                count -= sent
+            if count == 0:
+                return
+        except OSError:
+            pass
+    os.lseek(in_fd, offset, os.SEEK_SET)
+    while count > 0:
+        data = os.read(in_fd, min(count, 1024 * 1024))
+        if not data:
+            raise OSError("Unexpected end of file while copying")
+        os.write(out_fd, data)
+        count -= len(data)
+
+
+def reflink(in_fd, out_fd):
+    """Share the blocks of in_fd with out_fd (btrfs, XFS); False where the filesystem can't"""
+    if fcntl is None:
+        return False
+    try:
+        fcntl.ioctl(out_fd, FICLONE, in_fd)
+        return True
+    except OSError:
+        return False
+
+
+def copy_file(source: str, target: str):
+    """Copy with a reflink, falling back to copy_file_range/sendfile and then plain reads"""
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        if reflink(src.fileno(), dst.fileno()):
+            return
+        size = os.fstat(src.fileno()).st_size
+        try:
+            copy_range(src.fileno(), dst.fileno(), 0, size)
+        except OSError:
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+    shutil.copystat(source, target)
+
+
+def move_into(path: str, folder: str):
+    """
+    Move a file into folder and return its new path. Within one filesystem
+    this is a rename; across filesystems the file is copied under a hidden
+    temporary name first, so a partial copy is never visible.
+    """
+    target = os.path.join(folder, os.path.basename(path))
+    try:
+        os.replace(path, target)
+        return target
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    fd, temp_target = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=folder)
+    os.close(fd)
+    try:
+        copy_file(path, temp_target)
+        os.replace(temp_target, target)
+    except OSError:
+        if os.path.exists(temp_target):
+            os.remove(temp_target)
+        raise
+    os.remove(path)
+    return target
+
+
+def write_atomic(path: str, data, mode: int = None):
+    """
+    Replace path with data (str is written as UTF-8) through a temporary file
+    of its own in the same folder, so readers never see a partial file and
+    processes writing the same path at once can't remove each other's
+    temporary file. The file gets mode, by default what open() would give it.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+        os.chmod(temp_path, 0o666 & ~UMASK if mode is None else mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock across processes, held with flock on path; a no-op where fcntl is missing"""
+    with open(path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from tamga import Tamga
+from file_transfer import write_atomic
+
+
+class CachedResponse:
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes, from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+class HttpCache:
+    """
+    Pooled HTTP client for unauthenticated pages with an on-disk cache.
+    Responses younger than `ttl` are served without a request, older ones are
+    revalidated with If-None-Match/If-Modified-Since so an unchanged page costs
+    a 304. The cache is trimmed to `max_size` bytes, least recently used first.
+    """
+
+    def __init__(self, cache_dir: str = None, ttl: float = 300, max_size: int = 50 * 1024 * 1024, pool_size: int = 10, logger: Tamga = None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_size = max_size
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __paths(self, key):
+        name = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + '.json'), os.path.join(self.cache_dir, name + '.body')
+
+    def __load(self, key):
+        meta_path, body_path = self.__paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, None
+        return meta, body
+
+    def __store(self, key, meta, body=None):
+        meta_path, body_path = self.__paths(key)
+        if body is not None:
+            write_atomic(body_path, body)
+        write_atomic(meta_path, json.dumps(meta))
+
+    def __evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.body'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+                total += stat.st_size
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_size:
+                    break
+                for stale in (path, path[:-len('.body')] + '.json'):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                total -= size
+
+    def get(self, url: str, params: dict = None, timeout: float = 30, cached: bool = True):
+        """GET through the cache; with cached=False the pooled session is used and nothing is stored"""
+        key = requests.Request('GET', url, params=params).prepare().url
+        if not self.cache_dir or not cached:
+            r = self.session.get(key, timeout=timeout)
+            return CachedResponse(r.url, r.status_code, dict(r.headers), r.content)
+
+        meta, body = self.__load(key)
+        now = time.time()
+        if meta and now - meta['stored_at'] < self.ttl:
+            os.utime(self.__paths(key)[1])
+            return CachedResponse(key, meta['status_code'], meta['headers'], body, from_cache=True)
+
+        headers = {}
+        if meta:
+            if meta['headers'].get('ETag'):
+                headers['If-None-Match'] = meta['headers']['ETag']
+            if meta['headers'].get('Last-Modified'):
+                headers['If-Modified-Since'] = meta['headers']['Last-Modified']
+
+        r = self.session.get(key, headers=headers, timeout=timeout)
+        if r.status_code == 304 and meta:
+            self.logger.debug(f"Not modified: {key}")
+            meta['stored_at'] = now
+            self.__store(key, meta)
+            os.utime(self.__paths(key)[1])
+            return CachedResponse(key, meta['status_code'], meta['headers'], body, from_cache=True)
+
+        response = CachedResponse(r.url, r.status_code, dict(r.headers), r.content)
+        cacheable = 'no-store' not in r.headers.get('Cache-Control', '') and len(r.content) <= self.max_size
+        if r.status_code == 200 and cacheable:
+            kept_headers = {k: r.headers[k] for k in ('ETag', 'Last-Modified', 'Content-Type') if k in r.headers}
+            self.__store(key, {'stored_at': now, 'status_code': r.status_code, 'headers': kept_headers}, r.content)
+            self.__evict()
+        return response
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def shared_client(**kwargs):
+    """Process-wide client, created on first use with the given settings"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpCache(**kwargs)
+        return _shared_client
@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from tamga import Tamga
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    slug TEXT PRIMARY KEY,
+    year INTEGER,
+    week INTEGER,
+    output_path TEXT,
+    size INTEGER,
+    hash TEXT,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    updated_at REAL NOT NULL,
+    archive_size INTEGER,
+    archive_etag TEXT,
+    archive_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_version ON issues (year, week);
+"""
+
+ADDED_COLUMNS = {
+    'archive_size': 'INTEGER',
+    'archive_etag': 'TEXT',
+    'archive_hash': 'TEXT',
+}
+
+FIELDS = ('year', 'week', 'output_path', 'size', 'hash', 'status', 'created_at', 'archive_size', 'archive_etag', 'archive_hash')
+AUDIO_EXTENSIONS = ('.mp3', '.m4b', '.opus')
+
+
+def parse_version(name: str):
+    """(year, week) from names like respekt-21-2025 or Respekt_21_2025.mp3, None if it does not match"""
+    normalized = os.path.splitext(os.path.basename(name))[0].lower().replace('_', '-')
+    parts = normalized.split('-')
+    if len(parts) < 2:
+        return None
+    try:
+        week = int(parts[-2])
+        year = int(parts[-1])
+    except ValueError:
+        return None
+    return (year, week)
+
+
+class LibraryIndex:
+    """
+    SQLite index of processed issues keyed by slug, with a (year, week)
+    index, so finding the latest issue does not list and parse the archive.
+    """
+
+    def __init__(self, path: str, logger: Tamga = None):
+        self.path = path
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(issues)")}
+            for column, kind in ADDED_COLUMNS.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE issues ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS issues_archive ON issues (archive_hash)")
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, slug: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM issues WHERE slug = ?", (slug,)).fetchone()
+        return dict(row) if row else None
+
+    def is_published(self, slug: str):
+        issue = self.get(slug)
+        return bool(issue and issue['status'] == 'published')
+
+    def has_version(self, year: int, week: int):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM issues WHERE year = ? AND week = ? AND status = 'published' LIMIT 1", (year, week)
+            ).fetchone()
+        return row is not None
+
+    def latest(self):
+        """(year, week) of the newest published issue, None for an empty library"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT year, week FROM issues WHERE status = 'published' AND year IS NOT NULL "
+                "ORDER BY year DESC, week DESC LIMIT 1"
+            ).fetchone()
+        return (row['year'], row['week']) if row else None
+
+    def unfinished(self):
+        """Slugs that were started but never published, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT slug FROM issues WHERE status != 'published' ORDER BY year, week"
+            ).fetchall()
+        return [row['slug'] for row in rows]
+
+    def published(self):
+        """Published issues, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM issues WHERE status = 'published' ORDER BY year DESC, week DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def release_times(self):
+        """Release timestamps of published issues, used to learn the weekly schedule"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT created_at FROM issues WHERE status = 'published' AND created_at IS NOT NULL"
+            ).fetchall()
+        return [datetime.fromisoformat(row['created_at']) for row in rows]
+
+    def find_archive(self, hash: str, exclude: str = None):
+        """A published issue downloaded from an archive with the same content hash"""
+        if not hash:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM issues WHERE archive_hash = ? AND status = 'published' AND slug != ? LIMIT 1",
+                (hash, exclude or ''),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+
+    def upsert(self, slug: str, **fields):
+        unknown = set(fields) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown index fields: {', '.join(sorted(unknown))}")
+        if 'year' not in fields and 'week' not in fields:
+            version = parse_version(slug)
+            if version:
+                fields['year'], fields['week'] = version
+        fields.setdefault('status', 'pending')
+        columns = ['slug', *fields, 'updated_at']
+        values = [slug, *fields.values(), time.time()]
+        updates = ', '.join(f"{c} = excluded.{c}" for c in columns[1:])
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO issues ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT(slug) DO UPDATE SET {updates}",
+                values,
+            )
+
+    def mark_published(self, slug: str, output_path: str, hash: str = None, created_at: str = None):
+        size = os.path.getsize(output_path) if os.path.exists(output_path) else None
+        fields = {'output_path': output_path, 'size': size, 'status': 'published'}
+        if hash:
+            fields['hash'] = hash
+        if created_at:
+            fields['created_at'] = created_at
+        self.upsert(slug, **fields)
+
+    def rebuild(self, folder: str):
+        """Import every issue MP3/M4B/Opus file in folder; files that don't follow the naming pattern are skipped"""
+        imported = 0
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith('.') or not entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                version = parse_version(entry.name)
+                if not version:
+                    self.logger.warning(f"Skipping file that is not an issue: {entry.name}")
+                    continue
+                slug = os.path.splitext(entry.name)[0].lower().replace('_', '-')
+                year, week = version
+                self.upsert(
+                    slug,
+                    year=year,
+                    week=week,
+                    output_path=entry.path,
+                    size=entry.stat().st_size,
+                    status='published',
+                )
+                imported += 1
+        self.logger.success(f"Imported {imported} issues from {folder}")
+        return imported
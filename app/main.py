@@ -1,104 +1,582 @@
-import asyncio
+# Only what checking the catalog needs is imported here. The browser,
+# extraction, encoding detection and merge modules are imported where an
+# issue is actually processed, so a run that finds nothing new stays fast.
+import argparse
+import sys
 from tamga import Tamga
-from cookie_manager import get_cookies
-from create_podcast import CreatePodcast
-from audioteka_book import AudiotekaBook
+from http_cache import shared_client
+from library_index import LibraryIndex, parse_version
 import requests
-from bs4 import BeautifulSoup
-import json
+from catalog import CatalogCrawler
+from metrics import metrics
 import shutil
 import os
 
-logger = Tamga(
-        logToFile=True,
-        logToJSON=True,
-        logToConsole=True
-    )
+logger = Tamga(logToFile=False, logToJSON=False, logToConsole=True)
 
-refreshurl = f'https://audioteka.com/cz/katalog/respekt/'
+audioteka_base_url = os.getenv('audioteka_base_url', 'https://audioteka.com').rstrip('/')
+refreshurl = f'{audioteka_base_url}/cz/katalog/respekt/'
+probe_url = f'{audioteka_base_url}/cz/v2/me'
 
 password = os.getenv('password')
 email = os.getenv('email')
 respekt_folder = os.getenv('respekt_folder')
 download_directory = os.getenv('download_directory')
+download_segments = int(os.getenv('download_segments', 4))
+ingest_mode = os.getenv('ingest_mode', 'zip')
+merge_backend = os.getenv('merge_backend', 'ffmpeg')
+output_profile = os.getenv('output_profile', 'mp3')
+loudnorm = os.getenv('loudnorm', '').lower() in ('1', 'true', 'yes')
+transcode_workers = int(os.getenv('transcode_workers', 0)) or None
+cookie_cache = os.getenv('cookie_cache')
+browser_headless = os.getenv('browser_headless', '').lower() in ('1', 'true', 'yes')
+login_timeout = float(os.getenv('login_timeout', 30))
+http_cache_dir = os.getenv('http_cache_dir')
+http_cache_ttl = float(os.getenv('http_cache_ttl', 0))
+library_index_path = os.getenv('library_index')
+catalog_page_size = int(os.getenv('catalog_page_size', 30))
+catalog_concurrency = int(os.getenv('catalog_concurrency', 4))
+metadata_concurrency = int(os.getenv('metadata_concurrency', 8))
+poll_fast_interval = float(os.getenv('poll_fast_interval', 15 * 60))
+poll_slow_interval = float(os.getenv('poll_slow_interval', 6 * 3600))
+poll_default_interval = float(os.getenv('poll_default_interval', 3600))
+release_window_hours = float(os.getenv('release_window_hours', 6))
+feed_base_url = os.getenv('feed_base_url')
+feed_path = os.getenv('feed_path')
+feed_server_port = int(os.getenv('feed_server_port', 0))
+metrics_file = os.getenv('metrics_file')
+metrics_textfile = os.getenv('metrics_textfile')
+work_queue_path = os.getenv('work_queue')
+worker_id = os.getenv('worker_id')
+lease_seconds = float(os.getenv('lease_seconds', 600))
+max_attempts = int(os.getenv('max_attempts', 3))
+asset_cache_dir = os.getenv('asset_cache_dir')
+asset_cache_max_mb = float(os.getenv('asset_cache_max_mb', 200))
+cover_max_size = int(os.getenv('cover_max_size', 0))
 
 
-def parse_version(name):
-    normalized = name.lower().replace('_', '-')
-    parts = normalized.split('-')
-    
-    week = int(parts[-2])
-    year = int(parts[-1])
-    return (year, week)
+def stage_workers(stage, default):
+    return int(os.getenv(f'{stage}_workers', default))
 
-def main():
 
-    if not all([password, email, respekt_folder, refreshurl, download_directory]):
-        raise logger.error("Missing required environment variables")
-        return
-    r = requests.get(refreshurl)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, 'html.parser')
-    script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
-    slugs = []
-    if script_tag:
-        json_data = script_tag.string
-        data = json.loads(json_data)
-        for product in data['props']['pageProps']['productList']['_embedded']['app:product']:
-            slugs.append(product['slug'])
+def open_library_index():
+    return LibraryIndex(library_index_path or os.path.join(download_directory, 'library.sqlite'), logger)
+
+
+def rebuild_index():
+    if not all([respekt_folder, download_directory]):
+        logger.error("Missing required environment variables")
+        return 2
+    index = open_library_index()
+    index.rebuild(respekt_folder)
+    feed = open_feed()
+    if feed:
+        seed_feed(feed, index)
+    index.close()
 
-    respekt_files = [file.strip('.mp3') for file in os.listdir(respekt_folder) if file.endswith('.mp3')]
+def parse_week(value):
+    year, week = value.split('-')
+    return (int(year), int(week))
 
-    latest_file = max(respekt_files, key=lambda x: parse_version(x))
-    latest_year, latest_week = parse_version(latest_file)
+def open_work_queue():
+    from work_queue import WorkQueue
+
+    return WorkQueue(
+        work_queue_path or os.path.join(download_directory, 'work_queue.sqlite'),
+        worker_id,
+        lease_seconds,
+        logger,
+    )
+
+def open_http():
+    return shared_client(
+        cache_dir=http_cache_dir or os.path.join(download_directory, 'http_cache'),
+        ttl=http_cache_ttl,
+        logger=logger,
+    )
+
+
+def find_new_slugs(http, index, backfill: tuple = None, work_queue=None):
+    """
+    Slugs to process: issues newer than the latest published one and, given
+    the work queue, unfinished ones from earlier runs. Issues claimed
+    max_attempts times already are left out, except when backfilling.
+    """
+    crawler = CatalogCrawler(refreshurl, http, catalog_page_size, catalog_concurrency, logger=logger)
+
+    if backfill:
+        with metrics.span('catalog'):
+            return crawler.backfill(index, *backfill)
+
+    latest = index.latest()
+    logger.info(f"Latest local issue: {latest}")
+
+    with metrics.span('catalog'):
+        if latest is None:
+            products, _ = crawler.fetch_page(1)
+        else:
+            products = list(crawler.crawl(stop_at=latest))
 
     newer_slugs = []
-    for slug in slugs:
-        year, week = parse_version(slug)
-        if (year > latest_year) or (year == latest_year and week > latest_week):
+    for product in products:
+        slug = product['slug']
+        version = parse_version(slug)
+        if not version:
+            logger.warning(f"Skipping product that is not an issue: {slug}")
+            continue
+        if index.is_published(slug):
+            continue
+        if latest is None or version > latest:
             newer_slugs.append(slug)
+    if latest is None and newer_slugs:
+        newest = max(newer_slugs, key=parse_version)
+        logger.warning(f"The library is empty, only the newest issue {newest} is queued; use --backfill for older ones")
+        newer_slugs = [newest]
+    if work_queue is None:
+        return newer_slugs
+    unfinished = [slug for slug in index.unfinished() if slug not in newer_slugs]
+    slugs = []
+    for slug in newer_slugs + unfinished:
+        if work_queue.attempts(slug) >= max_attempts:
+            logger.warning(f"{slug}: failed {max_attempts} times, not trying again; use --backfill to retry it")
+            continue
+        if slug in unfinished:
+            logger.info(f"{slug}: unfinished from an earlier run, queued again")
+        slugs.append(slug)
+    return slugs
 
-    logger.info(f"Latest local file: {latest_file}")
-
-    if not newer_slugs:
-        logger.info("No new releases available")
-        return
 
-    logger.info(f"Newer releases available: {newer_slugs}")
+def login_session():
+    import asyncio
+    from cookie_manager import get_cookies
 
     try:
-        cookies = asyncio.run(get_cookies(email, password))
+        with metrics.span('login'):
+            cookies = asyncio.run(get_cookies(
+                email,
+                password,
+                cookie_cache_path(),
+                headless=browser_headless,
+                login_timeout=login_timeout,
+                probe_url=probe_url,
+            ))
     except Exception as e:
         logger.error(f"Failed to get cookies: {e}")
-        
+        return None
+
     session = requests.Session()
     for cookie in cookies:
         session.cookies.set_cookie(cookie)
+    return session
 
-    params = {
-        'page': '1',
-        'limit': '30',
-    }
 
-    for new_slug in newer_slugs:
-        download_directory_slug = os.path.join(download_directory, new_slug)
-        ab = AudiotekaBook(new_slug, download_directory_slug, logger)
+def cookie_cache_path():
+    return cookie_cache or os.path.join(download_directory, 'cookies.json')
+
+
+def open_feed(index=None):
+    """The podcast feed when feed_base_url is set; a new feed is filled with the issues already in index"""
+    if not feed_base_url:
+        return None
+    from feed import PodcastFeed
+    feed = PodcastFeed(feed_path or os.path.join(respekt_folder, 'feed.xml'), feed_base_url, logger=logger)
+    if index is not None and not os.path.exists(feed.path):
+        seed_feed(feed, index)
+    return feed
+
+
+def seed_feed(feed, index):
+    """
+    Add the published issues of the library that the feed is missing, e.g.
+    ones imported by --rebuild-index or published before feed_base_url was
+    set. Their title comes from the issue number and their date from the
+    index, or is the Monday of the issue's week when the index doesn't know
+    it, so they sort among the other issues by number.
+    """
+    from datetime import datetime, timezone
+    from create_podcast import PodcastData
+    from mp3_duration import scan_durations
+
+    issues = [issue for issue in index.published() if issue['output_path'] and os.path.exists(issue['output_path'])]
+    durations = scan_durations([issue['output_path'] for issue in issues if issue['output_path'].lower().endswith('.mp3')])
+    items = []
+    for issue in issues:
+        path = issue['output_path']
+        if issue['created_at']:
+            date = issue['created_at']
+        elif issue['year']:
+            date = datetime.fromisocalendar(issue['year'], issue['week'], 1).replace(tzinfo=timezone.utc).isoformat()
+        else:
+            date = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).isoformat()
+        title = f"Respekt {issue['week']}/{issue['year']}" if issue['year'] else issue['slug']
+        scanned = durations.get(path)
+        items.append((issue['slug'], PodcastData(None, None, book_title=title, date=date), path, scanned and scanned['duration_ms'], None))
+    added = feed.add_items(items)
+    if added:
+        logger.info(f"Added {added} issues from the library to the feed")
+
+
+def process(newer_slugs, session, http, index, work_queue, stop_event=None):
+    from asset_cache import shared_asset_cache
+    from audioteka_book import AudiotekaBook
+    from checkpoint import IssueCheckpoint, STAGES
+    from create_podcast import CreatePodcast
+    from file_transfer import move_into
+    from metadata_prefetch import MetadataPrefetcher
+    from pipeline import Pipeline, Stage
+    from playlist import shared_encoding_cache
+
+    shared_encoding_cache(path=os.path.join(download_directory, 'playlist_encodings.json'))
+    assets = shared_asset_cache(
+        directory=asset_cache_dir or os.path.join(download_directory, 'assets'),
+        max_size=int(asset_cache_max_mb * 1024 * 1024),
+        logger=logger,
+    )
+    feed = open_feed(index)
+    with metrics.span('metadata_prefetch'):
+        prefetched = MetadataPrefetcher(http, audioteka_base_url, metadata_concurrency, logger, assets).prefetch(newer_slugs)
+
+    def advance(ab, stage, **artifacts):
+        ab.checkpoint.advance(stage, **artifacts)
+        index.upsert(ab.slug, status=stage)
+
+    def record_archive(ab):
+        """Store what was downloaded; True when a published issue already came from the same archive"""
+        archive = ab.archive or {}
+        ab.duplicate = original_of(ab, archive)
+        index.upsert(
+            ab.slug,
+            status=ab.checkpoint.stage,
+            archive_size=archive.get('size'),
+            archive_etag=archive.get('etag'),
+            archive_hash=archive.get('hash'),
+        )
+        return ab.duplicate is not None
+
+    def original_of(ab, archive):
+        original = index.find_archive(archive.get('hash'), exclude=ab.slug)
+        if original and original['output_path'] and os.path.exists(original['output_path']):
+            logger.info(f"{ab.slug}: same archive as the published {original['slug']}, not merging it again")
+            return original
+        return None
+
+    def unchanged_archive(ab):
+        """
+        True when an earlier attempt at this slug hashed an archive that the
+        server still reports with the same ETag and size, and a published
+        issue has that hash. An ETag only identifies content of its own URL,
+        so it is never compared across slugs.
+        """
+        known = index.get(ab.slug)
+        if not known or not known['archive_hash'] or not known['archive_etag']:
+            return False
+        probed = ab.probe_archive(session)
+        if not probed or (probed['etag'], probed['size']) != (known['archive_etag'], known['archive_size']):
+            return False
+        ab.archive = {**probed, 'hash': known['archive_hash']}
+        return record_archive(ab)
 
+    def resumed(ab, stage):
+        """True when this stage or a later one already finished and its artifacts verify"""
+        for later in STAGES[STAGES.index(stage):]:
+            if ab.checkpoint.verify(later):
+                logger.info(f"{ab.slug}: '{stage}' already done ({later}), skipping")
+                return True
+        return False
+
+    def fetch_metadata(new_slug):
+        download_directory_slug = os.path.join(download_directory, new_slug)
+        product, cover = prefetched.get(new_slug, (None, None))
+        ab = AudiotekaBook(
+            new_slug,
+            download_directory_slug,
+            logger,
+            http,
+            audioteka_base_url,
+            product,
+            cover,
+            assets,
+            cover_max_size,
+        )
         logger.info(f"Book name: {ab.name}")
+        ab.checkpoint = IssueCheckpoint(download_directory_slug, new_slug)
+        ab.duplicate = None
+        if ab.checkpoint.stage:
+            logger.info(f"{new_slug}: resuming after stage '{ab.checkpoint.stage}'")
+        else:
+            advance(ab, 'metadata-fetched')
+        return ab
+
+    def download(ab):
+        if resumed(ab, 'downloaded'):
+            ab.downloaded_file_path = ab.checkpoint.artifacts.get('archive')
+            return ab
+        if unchanged_archive(ab):
+            return ab
+        if ingest_mode == 'stream':
+            with metrics.span('download_extract', issue=ab.slug) as span:
+                if not ab.stream_extract(session):
+                    span['ok'] = False
+                    return None
+                span['bytes'] = extracted_size(ab)
+            advance(ab, 'extracted', extracted_dir=ab.extracted_dir, extracted_files=ab.extracted_files)
+            record_archive(ab)
+            return ab
+        with metrics.span('download', issue=ab.slug) as span:
+            if not ab.download_file(session, download_segments):
+                span['ok'] = False
+                return None
+            span['bytes'] = os.path.getsize(ab.downloaded_file_path)
+        advance(ab, 'downloaded', archive=ab.downloaded_file_path, archive_size=span['bytes'])
+        if record_archive(ab):
+            os.remove(ab.downloaded_file_path)
+        return ab
+
+    def extract(ab):
+        if ab.duplicate:
+            return ab
+        if resumed(ab, 'extracted'):
+            ab.extracted_dir = ab.checkpoint.artifacts.get('extracted_dir')
+            return ab
+        with metrics.span('extract', issue=ab.slug) as span:
+            if not ab.extract_zip():
+                span['ok'] = False
+                return None
+            span['bytes'] = extracted_size(ab)
+        advance(ab, 'extracted', extracted_dir=ab.extracted_dir, extracted_files=ab.extracted_files)
+        os.remove(ab.downloaded_file_path)
+        return ab
+
+    def merge(ab):
+        if ab.duplicate:
+            return ab, ab.duplicate['output_path']
+        if resumed(ab, 'merged'):
+            return ab, ab.checkpoint.artifacts['output']
+        # Merged inside the issue's own folder; only publish moves it into
+        # respekt_folder, once the lease is confirmed
+        cp = CreatePodcast(
+            ab.create_podcast_data(ab.download_dir),
+            logger,
+            backend=merge_backend,
+            consume_sources=True,
+            profile=output_profile,
+            loudnorm=loudnorm,
+            workers=transcode_workers,
+        )
+        if not cp.make():
+            return None
+        advance(
+            ab,
+            'merged',
+            output=cp.pd.output_path,
+            output_size=os.path.getsize(cp.pd.output_path),
+            duration_ms=cp.duration_ms,
+            output_hash=cp.output_hash,
+        )
+        return ab, cp.pd.output_path
 
-        ab.download_file(session)
-        ab.extract_zip()
-        cp = CreatePodcast(ab.create_podcast_data())
-        cp.make()
-        logger.info(f"Copying podcast to: {respekt_folder}")
-        shutil.copy(cp.pd.output_path, respekt_folder)
+    def publish(merged):
+        ab, output_path = merged
+        if not work_queue.holds(ab.slug):
+            logger.error(f"{ab.slug}: lease lost to another worker, not publishing")
+            return None
+        if ab.duplicate:
+            index.mark_published(ab.slug, output_path, hash=ab.duplicate['hash'], created_at=ab.created_at.isoformat())
+            shutil.rmtree(ab.download_dir, ignore_errors=True)
+            work_queue.complete(ab.slug)
+            return ab
+        if os.path.dirname(os.path.realpath(output_path)) == os.path.realpath(respekt_folder):
+            published_path = output_path
+        else:
+            logger.info(f"Moving podcast to: {respekt_folder}")
+            with metrics.span('copy', issue=ab.slug) as span:
+                published_path = move_into(output_path, respekt_folder)
+                span['bytes'] = os.path.getsize(published_path)
+        index.mark_published(
+            ab.slug,
+            published_path,
+            hash=ab.checkpoint.artifacts.get('output_hash'),
+            created_at=ab.created_at.isoformat(),
+        )
+        if feed:
+            feed.add_item(
+                ab.slug,
+                ab.podcast_metadata(),
+                published_path,
+                ab.checkpoint.artifacts.get('duration_ms'),
+                ab.image_url,
+            )
         logger.success(f"Podcast {ab.name} created successfully")
+        with metrics.span('cleanup', issue=ab.slug):
+            shutil.rmtree(ab.download_dir, ignore_errors=True)
+        work_queue.complete(ab.slug)
+        return ab
 
-        shutil.rmtree(download_directory_slug, ignore_errors=True)
+    pipeline = Pipeline([
+        Stage('fetch', fetch_metadata, stage_workers('fetch', 2)),
+        Stage('download', download, stage_workers('download', 1)),
+        Stage('extract', extract, stage_workers('extract', 1)),
+        Stage('merge', merge, stage_workers('merge', 1)),
+        Stage('publish', publish, stage_workers('publish', 1)),
+    ], logger, stop_event)
+    work_queue.enqueue(newer_slugs, unpublished=lambda slug: not index.is_published(slug))
+    work_queue.requeue_expired()
+    with work_queue.kept_alive():
+        completed, failed = pipeline.run(work_queue.claims(newer_slugs, stop_event))
+    for slug, _ in failed + pipeline.skipped:
+        work_queue.release(slug)
+
+    if failed:
+        for slug, stage in failed:
+            logger.error(f"Podcast {slug} failed at stage: {stage}")
+        return False
+    if pipeline.skipped:
+        logger.info(f"Left for the next run: {[slug for slug, _ in pipeline.skipped]}")
+        return False
     logger.success("All podcasts processed successfully")
+    return True
+
+
+def extracted_size(ab):
+    return sum(os.path.getsize(os.path.join(ab.extracted_dir, name)) for name in ab.extracted_files)
+
+
+def report_metrics():
+    """Write the metrics of this run, also when there was nothing new, so the textfile never goes stale"""
+    if metrics_file:
+        metrics.write_jsonl(metrics_file)
+    if metrics_textfile:
+        metrics.write_prometheus(metrics_textfile)
+    if metrics.spans:
+        for row in metrics.summary():
+            logger.info(row)
+
+
+def open_state():
+    http = open_http()
+    index = open_library_index()
+    if index.count() == 0:
+        logger.info("Library index is empty, importing existing podcasts")
+        index.rebuild(respekt_folder)
+    return http, index
+
+
+def main(backfill: tuple = None):
+
+    if not all([password, email, respekt_folder, refreshurl, download_directory]):
+        logger.error("Missing required environment variables")
+        return 2
+    work_queue = None
+    try:
+        http, index = open_state()
+        work_queue = open_work_queue()
+        newer_slugs = find_new_slugs(http, index, backfill, work_queue)
+        if not newer_slugs:
+            logger.info("No new releases available")
+            return 0
+
+        logger.info(f"Newer releases available: {newer_slugs}")
+
+        session = login_session()
+        if not session:
+            return 1
+        return 0 if process(newer_slugs, session, http, index, work_queue) else 1
+    finally:
+        if work_queue:
+            work_queue.close()
+        report_metrics()
+
+
+def check():
+    """Exit status of --check: 0 when new issues are available, 1 when there are none, 2 on errors"""
+    if not all([respekt_folder, download_directory]):
+        logger.error("Missing required environment variables")
+        return 2
+    http, index = open_state()
+    try:
+        newer_slugs = find_new_slugs(http, index)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Failed to read the catalog: {e}")
+        return 2
+    finally:
+        index.close()
+    if not newer_slugs:
+        logger.info("No new releases available")
+        return 1
+    logger.info(f"Newer releases available: {newer_slugs}")
+    return 0
+
+
+def run_daemon():
+    from cookie_cache import CookieCache
+    from daemon import Daemon
+    from file_server import serve_in_background
+
+    if not all([password, email, respekt_folder, refreshurl, download_directory]):
+        logger.error("Missing required environment variables")
+        return 2
+    http, index = open_state()
+    work_queue = open_work_queue()
+    cache = CookieCache(cookie_cache_path(), probe_url, logger=logger)
+    state = {'session': None}
+
+    def poll(stop_event):
+        metrics.reset()
+        try:
+            poll_once(stop_event)
+        finally:
+            report_metrics()
+
+    def poll_once(stop_event):
+        newer_slugs = find_new_slugs(http, index, work_queue=work_queue)
+        if not newer_slugs:
+            logger.info("No new releases available")
+            return
+        logger.info(f"Newer releases available: {newer_slugs}")
+        if state['session'] is None or not cache.is_valid(list(state['session'].cookies)):
+            state['session'] = login_session()
+            if not state['session']:
+                return
+        process(newer_slugs, state['session'], http, index, work_queue, stop_event)
+
+    if feed_server_port:
+        serve_in_background(respekt_folder, port=feed_server_port, logger=logger)
+        logger.info(f"Serving {respekt_folder} on port {feed_server_port}")
+
+    Daemon(
+        poll,
+        index.release_times,
+        fast_interval=poll_fast_interval,
+        slow_interval=poll_slow_interval,
+        default_interval=poll_default_interval,
+        window_hours=release_window_hours,
+        logger=logger,
+    ).run()
 
-    
-        
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Download new Respekt issues and merge them into podcasts")
+    parser.add_argument('--rebuild-index', action='store_true', help="Import the existing podcasts folder into the library index and exit")
+    parser.add_argument('--backfill', nargs=2, metavar=('FROM', 'TO'), type=parse_week, help="Download every missing issue between two YEAR-WEEK values, e.g. 2024-1 2024-52")
+    parser.add_argument('--daemon', action='store_true', help="Keep running and poll for new issues around the expected release time")
+    parser.add_argument('--serve', action='store_true', help="Only serve the feed and podcasts over HTTP")
+    parser.add_argument('--check', action='store_true', help="Only check for new issues; exit status 0 if there are some, 1 if not, 2 on errors")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(check())
+    logger = Tamga(
+            logToFile=True,
+            logToJSON=True,
+            logToConsole=True
+        )
+    if args.rebuild_index:
+        sys.exit(rebuild_index())
+    elif args.serve:
+        port = feed_server_port or 8080
+        logger.info(f"Serving {respekt_folder} on port {port}")
+        from file_server import make_server
+        make_server(respekt_folder, port=port, logger=logger).serve_forever()
+    elif args.daemon:
+        sys.exit(run_daemon())
+    else:
+        sys.exit(main(backfill=args.backfill))
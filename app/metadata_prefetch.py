@@ -0,0 +1,61 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from tamga import Tamga
+from asset_cache import AssetCache
+from audioteka_book import BASE_URL, fetch_product
+from http_cache import HttpCache, shared_client
+
+
+class MetadataPrefetcher:
+    """
+    Fetches the product pages and covers of many issues at once over the
+    pooled client, at most `concurrency` requests in flight, so the metadata
+    of a whole backlog costs about one round trip instead of one per issue.
+    The blocking client runs on a dedicated thread pool of that size; the
+    default asyncio pool would cap it at a few threads on small machines.
+    With an asset cache, cached covers are not fetched again, fetched ones
+    are stored there instead of being returned, and product pages that did
+    not change are not parsed again.
+    """
+
+    def __init__(self, http: HttpCache = None, base_url: str = BASE_URL, concurrency: int = 8, logger: Tamga = None, assets: AssetCache = None):
+        self.http = http or shared_client()
+        self.base_url = base_url
+        self.concurrency = max(1, concurrency)
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self.assets = assets
+
+    async def __fetch(self, loop, pool, semaphore, slug):
+        async with semaphore:
+            product = await loop.run_in_executor(pool, fetch_product, self.http, slug, self.base_url)
+            cover = None
+            url = product.get('image_url') if product else None
+            if url and not (self.assets and self.assets.cover(url)):
+                response = await loop.run_in_executor(pool, functools.partial(self.http.get, url, cached=not self.assets))
+                if response.status_code == 200:
+                    cover = response.content
+                    if self.assets:
+                        self.assets.put_cover(url, cover)
+                        cover = None
+        return product, cover
+
+    async def fetch_all(self, slugs: list):
+        """{slug: (product, cover bytes)} for every slug whose product page could be read"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='prefetch') as pool:
+            results = await asyncio.gather(
+                *(self.__fetch(loop, pool, semaphore, slug) for slug in slugs),
+                return_exceptions=True,
+            )
+        prefetched = {}
+        for slug, result in zip(slugs, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"Prefetching {slug} failed: {result}")
+            elif result[0]:
+                prefetched[slug] = result
+        return prefetched
+
+    def prefetch(self, slugs: list):
+        return asyncio.run(self.fetch_all(slugs))
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from file_transfer import write_atomic
+
+
+class Metrics:
+    """
+    Collects timing spans for the stages of a run. A span may carry the
+    number of bytes it moved so network and disk stages report throughput.
+    Results go to a JSON-lines file, a Prometheus textfile and a summary table.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.started = time.time()
+
+    def record(self, stage: str, seconds: float, bytes: int = None, issue: str = None, ok: bool = True):
+        span = {
+            'stage': stage,
+            'issue': issue,
+            'start': time.time() - seconds,
+            'seconds': seconds,
+            'bytes': bytes,
+            'ok': ok,
+        }
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, stage: str, issue: str = None):
+        """Time a block; set `span['bytes']` to record throughput, `span['ok'] = False` to mark a failure"""
+        span = {'bytes': None, 'ok': True}
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield span
+            ok = True
+        finally:
+            self.record(stage, time.perf_counter() - started, span['bytes'], issue, ok and span['ok'])
+
+    def totals(self):
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            total = totals.setdefault(span['stage'], {'count': 0, 'seconds': 0.0, 'bytes': 0, 'failed': 0})
+            total['count'] += 1
+            total['seconds'] += span['seconds']
+            total['bytes'] += span['bytes'] or 0
+            total['failed'] += 0 if span['ok'] else 1
+        return totals
+
+    def write_jsonl(self, path: str):
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps({'run': self.started, **span}) + '\n')
+
+    def write_prometheus(self, path: str):
+        """Write the totals of this run in the node_exporter textfile collector format"""
+        totals = sorted(self.totals().items())
+        gauges = [
+            ('respekt_stage_duration_seconds', 'Time spent in a stage during the last run.',
+             [(stage, f"{total['seconds']:.6f}") for stage, total in totals]),
+            ('respekt_stage_runs', 'Number of times a stage ran during the last run.',
+             [(stage, total['count']) for stage, total in totals]),
+            ('respekt_stage_failures', 'Number of failed runs of a stage during the last run.',
+             [(stage, total['failed']) for stage, total in totals]),
+            ('respekt_stage_bytes', 'Bytes moved by a stage during the last run.',
+             [(stage, total['bytes']) for stage, total in totals if total['bytes']]),
+            ('respekt_stage_bytes_per_second', 'Throughput of a stage during the last run.',
+             [(stage, f"{total['bytes'] / total['seconds']:.1f}") for stage, total in totals if total['bytes'] and total['seconds'] > 0]),
+        ]
+        lines = []
+        for name, help, samples in gauges:
+            lines += [f'# HELP {name} {help}', f'# TYPE {name} gauge']
+            lines += [f'{name}{{stage="{stage}"}} {value}' for stage, value in samples]
+        lines += [
+            '# HELP respekt_last_run_timestamp_seconds Start time of the last run.',
+            '# TYPE respekt_last_run_timestamp_seconds gauge',
+            f'respekt_last_run_timestamp_seconds {self.started:.0f}',
+        ]
+        write_atomic(path, '\n'.join(lines) + '\n')
+
+    def summary(self):
+        """Rows of a plain-text table with time and throughput per stage"""
+        rows = [f"{'stage':<22}{'runs':>6}{'seconds':>10}{'MB':>10}{'MB/s':>9}"]
+        for stage, total in sorted(self.totals().items(), key=lambda item: -item[1]['seconds']):
+            mb = total['bytes'] / (1024 * 1024)
+            rate = f"{mb / total['seconds']:.1f}" if total['bytes'] and total['seconds'] > 0 else '-'
+            rows.append(f"{stage:<22}{total['count']:>6}{total['seconds']:>10.2f}{mb if total['bytes'] else 0:>10.1f}{rate:>9}")
+        return rows
+
+
+metrics = Metrics()
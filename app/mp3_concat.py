@@ -0,0 +1,128 @@
+import mmap
+import os
+import struct
+from tamga import Tamga
+from mp3_frames import audio_range
+from file_transfer import copy_range
+
+
+MAX_CHAPTERS = 255
+
+
+def _encode_text(text: str):
+    try:
+        return b'\x00' + text.encode('latin-1')
+    except UnicodeEncodeError:
+        return b'\x01' + text.encode('utf-16')
+
+
+def _empty_text(encoded: bytes):
+    return b'\xff\xfe\x00\x00' if encoded[:1] == b'\x01' else b'\x00'
+
+
+def _frame(frame_id: str, payload: bytes):
+    return frame_id.encode('ascii') + struct.pack('>IH', len(payload), 0) + payload
+
+
+def _text_frame(frame_id: str, text: str):
+    return _frame(frame_id, _encode_text(text))
+
+
+def _comment_frame(text: str, language: bytes = b'XXX'):
+    encoded = _encode_text(text)
+    return _frame('COMM', encoded[:1] + language + _empty_text(encoded) + encoded[1:])
+
+
+def _picture_frame(path: str):
+    with open(path, 'rb') as f:
+        image = f.read()
+    mime = b'image/png' if image[:8] == b'\x89PNG\r\n\x1a\n' else b'image/jpeg'
+    return _frame('APIC', b'\x00' + mime + b'\x00' + b'\x03' + b'Cover (front)\x00' + image)
+
+
+def build_id3_tag(chapters: list, title=None, artist=None, album=None, date=None, comment=None, cover_path=None, padding: int = 1024):
+    """
+    Build an ID3v2.3 tag with text frames, an APIC cover and CHAP/CTOC chapter
+    frames. Chapters are dicts with 'title', 'start_ms' and 'end_ms'. The CTOC
+    frame counts its entries in one byte, so more than MAX_CHAPTERS chapters
+    raise ValueError.
+    """
+    if len(chapters) > MAX_CHAPTERS:
+        raise ValueError(f"{len(chapters)} chapters, an ID3 table of contents holds at most {MAX_CHAPTERS}")
+    frames = []
+    if title:
+        frames.append(_text_frame('TIT2', title))
+    if artist:
+        frames.append(_text_frame('TPE1', artist))
+    if album:
+        frames.append(_text_frame('TALB', album))
+    if date:
+        date = str(date)
+        frames.append(_text_frame('TYER', date[:4]))
+        if len(date) >= 10:
+            frames.append(_text_frame('TDAT', date[8:10] + date[5:7]))
+        if len(date) >= 16:
+            frames.append(_text_frame('TIME', date[11:13] + date[14:16]))
+    if comment:
+        frames.append(_comment_frame(comment))
+    if cover_path:
+        frames.append(_picture_frame(cover_path))
+
+    if chapters:
+        element_ids = [f'chp{i}'.encode('ascii') for i in range(len(chapters))]
+        frames.append(_frame('CTOC', b'toc\x00' + b'\x03' + bytes([len(chapters)]) + b''.join(e + b'\x00' for e in element_ids)))
+        for element_id, chapter in zip(element_ids, chapters):
+            sub_frame = _text_frame('TIT2', chapter['title'])
+            times = struct.pack('>IIII', int(chapter['start_ms']), int(chapter['end_ms']), 0xFFFFFFFF, 0xFFFFFFFF)
+            frames.append(_frame('CHAP', element_id + b'\x00' + times + sub_frame))
+
+    body = b''.join(frames) + b'\x00' * padding
+    size = len(body)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b'ID3\x03\x00\x00' + syncsafe + body
+
+
+class Mp3Concatenator:
+    """
+    Concatenates MP3 files in-process: writes one ID3v2.3 tag and then the
+    raw MPEG frames of every input, skipping their own ID3/APE tags and
+    Xing/Info headers. Frames are copied with copy_file_range/sendfile when
+    the platform has them. With `consume` each input is deleted once its
+    frames are written, so the inputs and the output don't all sit on disk.
+    """
+
+    def __init__(self, logger: Tamga = None):
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+
+    def __frame_range(self, path):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                found = audio_range(data)
+        if not found:
+            return None
+        start, end, _, _ = found
+        return start, end
+
+    def concat(self, files: list, output_path: str, tag: bytes, consume: bool = False):
+        written = 0
+        with open(output_path, 'wb') as out:
+            out.write(tag)
+            out.flush()
+            out_fd = out.fileno()
+            for path in files:
+                frame_range = self.__frame_range(path)
+                if not frame_range:
+                    self.logger.warning(f"No MPEG audio frames found in: {path}")
+                    continue
+                start, end = frame_range
+                in_fd = os.open(path, os.O_RDONLY)
+                try:
+                    copy_range(in_fd, out_fd, start, end - start)
+                finally:
+                    os.close(in_fd)
+                written += end - start
+                if consume:
+                    os.remove(path)
+        return written
@@ -0,0 +1,57 @@
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from mp3_frames import audio_range, iter_frames
+
+
+def scan_duration(path: str):
+    """
+    Count the samples of an MP3 file. Uses the frame count of a Xing/Info or
+    VBRI header when present and walks the frame headers otherwise.
+
+    Returns a dict with 'samples', 'sample_rate', 'duration_ms' and 'source',
+    or None when the file holds no MPEG audio. 'samples' counts every frame,
+    which is what plays back once the frames are stream-copied into a merged
+    file; encoder delay and padding are reported separately when known.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            found = audio_range(data)
+            if not found:
+                return None
+            start, end, header, info = found
+
+            if info and info.get('frames'):
+                samples = info['frames'] * header.samples
+                source = info['kind']
+            else:
+                samples = sum(frame.samples for _, frame in iter_frames(data, start, end))
+                source = 'frames'
+
+    return {
+        'samples': samples,
+        'sample_rate': header.sample_rate,
+        'duration_ms': samples * 1000 / header.sample_rate,
+        'delay': info.get('delay', 0) if info else 0,
+        'padding': info.get('padding', 0) if info else 0,
+        'source': source,
+    }
+
+
+def scan_durations(paths: list, workers: int = None):
+    """Scan several files concurrently, returns {path: result}"""
+    if not paths:
+        return {}
+    workers = workers or min(8, len(paths), (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(_safe_scan, paths)))
+
+
+def _safe_scan(path):
+    try:
+        return scan_duration(path)
+    except (OSError, ValueError, struct.error):
+        return None
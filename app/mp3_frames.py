@@ -0,0 +1,181 @@
+import struct
+from dataclasses import dataclass
+
+
+BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+SAMPLE_RATES = {
+    1: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    2.5: (11025, 12000, 8000),
+}
+
+VERSIONS = {0: 2.5, 2: 2, 3: 1}
+LAYERS = {1: 3, 2: 2, 3: 1}
+
+
+@dataclass
+class FrameHeader:
+
+    version: float
+    layer: int
+    bitrate: int
+    sample_rate: int
+    padding: int
+    mono: bool
+    length: int
+    samples: int
+
+
+def parse_header(data, offset: int):
+    """Parse the MPEG audio frame header at offset, None if there is none"""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = VERSIONS.get((b1 >> 3) & 0x03)
+    layer = LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    mono = (b3 >> 6) == 3
+
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+        samples = 384
+    elif layer == 3 and version != 1:
+        length = 72 * bitrate // sample_rate + padding
+        samples = 576
+    else:
+        length = 144 * bitrate // sample_rate + padding
+        samples = 1152
+
+    return FrameHeader(version, layer, bitrate, sample_rate, padding, mono, length, samples)
+
+
+def id3v2_size(data):
+    """Size of a leading ID3v2 tag including its footer, 0 if there is none"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | (b & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def trailing_tags_size(data):
+    """Size of ID3v1 and APEv2 tags at the end of the file"""
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+    if end >= 32 and data[end - 32:end - 24] == b'APETAGEX':
+        tag_size, flags = struct.unpack('<II', data[end - 20:end - 12])
+        end -= tag_size + (32 if flags & 0x80000000 else 0)
+    return len(data) - max(end, 0)
+
+
+def find_first_frame(data, start: int = 0, limit: int = 64 * 1024):
+    """Offset of the first frame followed by another valid frame header"""
+    stop = min(len(data), start + limit)
+    offset = start
+    while offset < stop:
+        offset = data.find(b'\xff', offset, stop)
+        if offset < 0:
+            return None
+        header = parse_header(data, offset)
+        if header and header.length > 0:
+            following = offset + header.length
+            if following >= len(data) or parse_header(data, following):
+                return offset
+        offset += 1
+    return None
+
+
+def xing_offset(header: FrameHeader):
+    if header.version == 1:
+        return 4 + (17 if header.mono else 32)
+    return 4 + (9 if header.mono else 17)
+
+
+def info_frame(data, offset: int, header: FrameHeader):
+    """
+    Parse a Xing/Info or VBRI header stored in the first frame. Returns a dict
+    with 'kind', 'frames', 'bytes' and, for LAME, 'delay' and 'padding'.
+    """
+    position = offset + xing_offset(header)
+    tag = bytes(data[position:position + 4])
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[position + 4:position + 8])[0]
+        cursor = position + 8
+        info = {'kind': tag.decode('ascii'), 'frames': None, 'bytes': None}
+        if flags & 0x01:
+            info['frames'] = struct.unpack('>I', data[cursor:cursor + 4])[0]
+            cursor += 4
+        if flags & 0x02:
+            info['bytes'] = struct.unpack('>I', data[cursor:cursor + 4])[0]
+            cursor += 4
+        if flags & 0x04:
+            cursor += 100
+        if flags & 0x08:
+            cursor += 4
+        if bytes(data[cursor:cursor + 4]) in (b'LAME', b'Lavf', b'Lavc') and cursor + 24 <= offset + header.length:
+            delay_padding = data[cursor + 21:cursor + 24]
+            info['delay'] = (delay_padding[0] << 4) | (delay_padding[1] >> 4)
+            info['padding'] = ((delay_padding[1] & 0x0F) << 8) | delay_padding[2]
+        return info
+
+    position = offset + 36
+    if bytes(data[position:position + 4]) == b'VBRI':
+        delay = struct.unpack('>H', data[position + 6:position + 8])[0]
+        size, frames = struct.unpack('>II', data[position + 10:position + 18])
+        return {'kind': 'VBRI', 'frames': frames, 'bytes': size, 'delay': delay}
+    return None
+
+
+def audio_range(data):
+    """
+    Byte range (start, end) holding the raw MPEG frames of a file, without
+    ID3/APE tags and without the Xing/Info/VBRI frame. Also returns the first
+    frame header and the parsed info frame, if any.
+    """
+    start = id3v2_size(data)
+    end = len(data) - trailing_tags_size(data)
+    first = find_first_frame(data, start)
+    if first is None:
+        return None
+    header = parse_header(data, first)
+    info = info_frame(data, first, header)
+    if info:
+        first += header.length
+    return first, end, header, info
+
+
+def iter_frames(data, start: int, end: int):
+    """Yield (offset, header) for consecutive frames, resyncing over garbage"""
+    offset = start
+    while offset < end:
+        header = parse_header(data, offset)
+        if header is None or header.length <= 0:
+            resync = find_first_frame(data, offset + 1)
+            if resync is None or resync >= end:
+                return
+            offset = resync
+            continue
+        if offset + header.length > end:
+            return
+        yield offset, header
+        offset += header.length
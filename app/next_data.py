@@ -0,0 +1,60 @@
+import json
+import re
+
+
+SCRIPT_OPEN = re.compile(rb'<script[^>]*\bid=["\']?__NEXT_DATA__["\']?[^>]*>', re.IGNORECASE)
+SCRIPT_CLOSE = b'</script>'
+
+
+def _as_bytes(html):
+    return html.encode('utf-8') if isinstance(html, str) else html
+
+
+def _slice_payload(html: bytes):
+    match = SCRIPT_OPEN.search(html)
+    if not match:
+        return None
+    end = html.find(SCRIPT_CLOSE, match.end())
+    if end < 0:
+        return None
+    return html[match.end():end]
+
+
+def _lxml_payload(html: bytes):
+    try:
+        from lxml import html as lxml_html
+    except ImportError:
+        return None
+    tree = lxml_html.fromstring(html)
+    scripts = tree.xpath('//script[@id="__NEXT_DATA__"]/text()')
+    return scripts[0].encode('utf-8') if scripts else None
+
+
+def extract_next_data(html):
+    """
+    Return the parsed `<script id="__NEXT_DATA__">` JSON of a Next.js page,
+    or None. The payload is sliced straight out of the bytes; lxml is only
+    used when the slice does not decode.
+    """
+    html = _as_bytes(html)
+    payload = _slice_payload(html)
+    if payload is not None:
+        try:
+            return json.loads(payload)
+        except ValueError:
+            pass
+    payload = _lxml_payload(html)
+    if payload is None:
+        return None
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def extract_page_prop(html, key: str):
+    """Return props.pageProps[key] of the page, or None"""
+    data = extract_next_data(html)
+    if not data:
+        return None
+    return data.get('props', {}).get('pageProps', {}).get(key)
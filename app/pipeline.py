@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from tamga import Tamga
+
+
+_STOP = object()
+
+
+class Stage:
+
+    def __init__(self, name: str, func, workers: int = 1, queue_size: int = 1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages, each with its own worker pool and a
+    bounded input queue, so the next item can download while the previous one
+    is merged. A stage function returns the value handed to the next stage;
+    returning None (or raising) drops the item.
+    """
+
+    def __init__(self, stages: list, logger: Tamga = None, stop_event: threading.Event = None):
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self.stages = stages
+        self.stop_event = stop_event
+        self.completed = []
+        self.failed = []
+        self.skipped = []
+        self._lock = threading.Lock()
+
+    def __worker(self, index: int, stage: Stage):
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = stage.queue.get()
+            if item is _STOP:
+                break
+            key, value = item
+            if self.stop_event and self.stop_event.is_set():
+                self.logger.info(f"[{stage.name}] {key} skipped, shutting down")
+                with self._lock:
+                    self.skipped.append((key, stage.name))
+                continue
+            started = time.monotonic()
+            try:
+                result = stage.func(value)
+            except BaseException as e:
+                self.logger.error(f"[{stage.name}] {key} failed: {e!r}")
+                result = None
+            elapsed = time.monotonic() - started
+            if result is None:
+                with self._lock:
+                    self.failed.append((key, stage.name))
+                continue
+            self.logger.debug(f"[{stage.name}] {key} done in {elapsed:.1f}s")
+            if next_stage:
+                next_stage.queue.put((key, result))
+            else:
+                with self._lock:
+                    self.completed.append((key, result))
+
+    def run(self, items: list):
+        threads = []
+        for index, stage in enumerate(self.stages):
+            stage_threads = []
+            for n in range(stage.workers):
+                t = threading.Thread(target=self.__worker, args=(index, stage), name=f"{stage.name}-{n}", daemon=True)
+                t.start()
+                stage_threads.append(t)
+            threads.append(stage_threads)
+
+        for item in items:
+            self.stages[0].queue.put((item, item))
+
+        for stage, stage_threads in zip(self.stages, threads):
+            for _ in stage_threads:
+                stage.queue.put(_STOP)
+            for t in stage_threads:
+                t.join()
+
+        return self.completed, self.failed
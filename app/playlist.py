@@ -0,0 +1,277 @@
+import codecs
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from file_transfer import write_atomic
+
+
+PLAYLIST_EXTENSIONS = ('.pls', '.m3u8', '.m3u', '.cue')
+DETECT_PREFIX = 64 * 1024
+
+BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+PLS_KEY = re.compile(r'(file|title|length)(\d+)$', re.IGNORECASE)
+CUE_COMMAND = re.compile(r'\s*(\w+)\s+(.*?)\s*$')
+
+
+class EncodingCache:
+    """
+    Detected playlist encodings keyed by a hash of the file content, so a
+    playlist seen before is decoded without running detection again. Kept
+    in memory and, when `path` is set, in a small JSON file.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+    def get(self, key: str):
+        with self._lock:
+            encoding = self.entries.get(key)
+            if encoding:
+                self.entries.move_to_end(key)
+            return encoding
+
+    def put(self, key: str, encoding: str):
+        with self._lock:
+            self.entries[key] = encoding
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if not self.path:
+                return
+            try:
+                write_atomic(self.path, json.dumps(self.entries))
+            except OSError:
+                pass
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def shared_encoding_cache(**kwargs):
+    """Process-wide encoding cache, created on first use with the given settings"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EncodingCache(**kwargs)
+        return _shared_cache
+
+
+def detect_encoding(raw: bytes, prefix: int = DETECT_PREFIX):
+    """
+    Encoding of a playlist: from its BOM, UTF-8 when it decodes as such,
+    otherwise chardet's guess over at most `prefix` bytes, cut at a line end.
+    """
+    for bom, encoding in BOMS:
+        if raw.startswith(bom):
+            return encoding
+    try:
+        raw.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    import chardet
+
+    sample = raw[:prefix]
+    if len(raw) > prefix and b'\n' in sample:
+        sample = sample[:sample.rfind(b'\n') + 1]
+    return chardet.detect(sample)['encoding'] or 'utf-8'
+
+
+def read_playlist(path: str, cache: EncodingCache = None):
+    """Decoded text of a playlist file, read once"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    if path.lower().endswith('.m3u8'):
+        encoding = 'utf-8-sig'
+    else:
+        key = hashlib.blake2b(raw, digest_size=16).hexdigest()
+        encoding = cache.get(key) if cache else None
+        if not encoding:
+            encoding = detect_encoding(raw)
+            if cache:
+                cache.put(key, encoding)
+    try:
+        return raw.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return raw.decode('utf-8', errors='replace')
+
+
+def _entry(filename, title=None, length=0.0):
+    filename = filename.strip().replace('\\', '/')
+    return {
+        'filename': filename,
+        'title': title or os.path.splitext(os.path.basename(filename))[0],
+        'length': length if length > 0 else 0,
+    }
+
+
+def parse_pls(text: str):
+    """
+    Entries of a PLS playlist in entry-number order. Lengths are in
+    milliseconds as Audioteka writes them; returned lengths are seconds.
+    """
+    fields = {}
+    declared = None
+    for line in text.splitlines():
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        match = PLS_KEY.match(key)
+        if match:
+            fields.setdefault(int(match.group(2)), {})[match.group(1).lower()] = value.strip()
+        elif key.lower() == 'numberofentries':
+            try:
+                declared = int(value)
+            except ValueError:
+                pass
+
+    count = declared if declared is not None else max(fields, default=0)
+    entries = []
+    missing = []
+    for i in range(1, count + 1):
+        item = fields.get(i, {})
+        if not item.get('file'):
+            missing.append(i)
+            continue
+        try:
+            length = int(item.get('length', 0)) / 1000
+        except ValueError:
+            length = 0
+        entries.append(_entry(item['file'], item.get('title'), length))
+    return entries, missing
+
+
+def parse_m3u(text: str):
+    """Entries of an M3U/M3U8 playlist; #EXTINF durations are in seconds"""
+    entries = []
+    info = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            if line.upper().startswith('#EXTINF:'):
+                duration, _, title = line[len('#EXTINF:'):].partition(',')
+                try:
+                    length = float(duration.split()[0]) if duration.strip() else 0
+                except ValueError:
+                    length = 0
+                info = (title.strip(), length)
+            continue
+        title, length = info or (None, 0)
+        entries.append(_entry(line, title, length))
+        info = None
+    return entries, []
+
+
+def _cue_value(value: str):
+    if value.startswith('"'):
+        end = value.find('"', 1)
+        return value[1:end] if end > 0 else value[1:]
+    return value.split()[0] if value else ''
+
+
+def _cue_time(value: str):
+    """Seconds of an mm:ss:ff CUE time, 75 frames to the second"""
+    minutes, seconds, frames = (int(part) for part in value.split(':'))
+    return minutes * 60 + seconds + frames / 75
+
+
+def parse_cue(text: str):
+    """
+    Entries of a CUE sheet, one per TRACK, each with 'offset': the start of
+    its INDEX 01 in seconds from the start of its FILE. A FILE without
+    tracks is one entry.
+    """
+    entries = []
+    current = None
+    for line in text.splitlines():
+        match = CUE_COMMAND.match(line)
+        if not match:
+            continue
+        command, value = match.group(1).upper(), match.group(2)
+        if command == 'FILE':
+            current = {'file': _cue_value(value), 'title': None, 'offset': 0.0, 'track': False}
+            entries.append(current)
+        elif command == 'TRACK' and current:
+            if current['track']:
+                current = {'file': current['file'], 'title': None, 'offset': 0.0, 'track': True}
+                entries.append(current)
+            current['track'] = True
+        elif command == 'TITLE' and current and current['title'] is None:
+            current['title'] = _cue_value(value)
+        elif command == 'INDEX' and current:
+            number, _, time = value.partition(' ')
+            if number.strip() == '01':
+                try:
+                    current['offset'] = _cue_time(time.strip())
+                except ValueError:
+                    pass
+    return [dict(_entry(item['file'], item['title']), offset=item['offset']) for item in entries], []
+
+
+PARSERS = {
+    '.pls': parse_pls,
+    '.m3u': parse_m3u,
+    '.m3u8': parse_m3u,
+    '.cue': parse_cue,
+}
+
+
+def _sniff(text: str):
+    head = text.lstrip('\ufeff \t\r\n')[:4096].lower()
+    if head.startswith('[playlist]'):
+        return parse_pls
+    if head.startswith('#extm3u'):
+        return parse_m3u
+    if re.search(r'^\s*file\s+"', head, re.MULTILINE):
+        return parse_cue
+    return parse_pls if 'file1=' in head else parse_m3u
+
+
+def parse_playlist(path: str, cache: EncodingCache = None):
+    """
+    Chapters of a PLS, M3U/M3U8 or CUE playlist as dicts with 'filename',
+    'title' and 'length' (seconds, 0 when unknown), together with the entry
+    numbers that were declared but missing. CUE entries also have 'offset',
+    where the chapter starts within its file.
+    """
+    text = read_playlist(path, cache)
+    parser = PARSERS.get(os.path.splitext(path)[1].lower()) or _sniff(text)
+    return parser(text)
+
+
+def find_playlist(folder: str, names: list = None):
+    """The playlist in folder, preferring PLS over M3U8, M3U and CUE"""
+    if names is None:
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return None
+    by_extension = {}
+    for name in sorted(names):
+        by_extension.setdefault(os.path.splitext(name)[1].lower(), name)
+    for extension in PLAYLIST_EXTENSIONS:
+        if extension in by_extension:
+            return os.path.join(folder, by_extension[extension])
+    return None
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from tamga import Tamga
+from content_hash import LEAF_SIZE, StreamHash, TreeHash, hash_file
+from file_transfer import write_atomic
+
+
+class SegmentedDownloader:
+    """
+    Downloads a file as parallel HTTP byte ranges into a preallocated file.
+    Progress is kept in a `<path>.part` manifest so an interrupted download
+    resumes where it stopped. Servers without range support get a single stream.
+    Segments start on hash leaf boundaries, so the content hash is computed
+    from the chunks as they are written.
+    """
+
+    def __init__(self, session: requests.Session, segments: int = 4, chunk_size: int = 256 * 1024, retries: int = 3, logger: Tamga = None):
+        self.session = session
+        self.segments = max(1, segments)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        self._lock = threading.Lock()
+
+    def probe(self, url: str):
+        """Final URL, size, ETag and range support of the file, from a one-byte request"""
+        with self.session.get(url, headers={'Range': 'bytes=0-0'}, stream=True) as r:
+            r.raise_for_status()
+            total = None
+            content_range = r.headers.get('Content-Range', '')
+            if r.status_code == 206 and '/' in content_range:
+                size = content_range.rsplit('/', 1)[1]
+                if size.isdigit():
+                    total = int(size)
+            accepts_ranges = r.status_code == 206 or r.headers.get('Accept-Ranges', '').lower() == 'bytes'
+            if total is None and r.headers.get('Content-Length', '').isdigit() and r.status_code == 200:
+                total = int(r.headers['Content-Length'])
+            return {
+                'url': r.url,
+                'size': total,
+                'etag': r.headers.get('ETag'),
+                'ranges': accepts_ranges and total is not None,
+            }
+
+    def __load_manifest(self, manifest_path, info):
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('size') != info['size'] or manifest.get('etag') != info['etag']:
+            self.logger.warning("Remote file changed since the last attempt, restarting download")
+            return None
+        return manifest
+
+    def __save_manifest(self, manifest_path, manifest):
+        write_atomic(manifest_path, json.dumps(manifest))
+
+    def __new_manifest(self, info):
+        size = info['size']
+        count = min(self.segments, max(1, size // (1024 * 1024)))
+        step = -(-size // count)
+        step = max(LEAF_SIZE, -(-step // LEAF_SIZE) * LEAF_SIZE)
+        segments = []
+        for start in range(0, max(size, 1), step):
+            segments.append({'start': start, 'end': min(start + step, size) - 1, 'done': 0})
+        return {'size': size, 'etag': info['etag'], 'segments': segments, 'leaves': {}}
+
+    def __fetch_segment(self, url, path, manifest_path, manifest, segment, tree):
+        for attempt in range(1, self.retries + 1):
+            offset = segment['start'] + segment['done']
+            if offset > segment['end']:
+                return True
+            try:
+                headers = {'Range': f"bytes={offset}-{segment['end']}"}
+                with self.session.get(url, headers=headers, stream=True, timeout=60) as r:
+                    r.raise_for_status()
+                    if r.status_code != 206:
+                        raise requests.exceptions.RequestException(f"Server ignored range request ({r.status_code})")
+                    with open(path, 'r+b') as f:
+                        tree.catch_up(f, offset)
+                        f.seek(offset)
+                        for chunk in r.iter_content(chunk_size=self.chunk_size):
+                            f.write(chunk)
+                            tree.update(offset, chunk)
+                            offset += len(chunk)
+                            with self._lock:
+                                segment['done'] += len(chunk)
+                                manifest['leaves'] = tree.completed()
+                                self.__save_manifest(manifest_path, manifest)
+                if segment['start'] + segment['done'] > segment['end']:
+                    return True
+                self.logger.warning(f"Segment {segment['start']}-{segment['end']} attempt {attempt} ended early at byte {offset}")
+            except requests.exceptions.RequestException as e:
+                self.logger.warning(f"Segment {segment['start']}-{segment['end']} attempt {attempt} failed: {e}")
+        return False
+
+    def __download_stream(self, url, path):
+        digest = StreamHash()
+        with self.session.get(url, stream=True) as r:
+            r.raise_for_status()
+            with open(path, 'wb') as f:
+                for chunk in r.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def download(self, url: str, path: str):
+        """Download url to path and return its size, ETag and content hash (content_hash.TreeHash)"""
+        manifest_path = path + '.part'
+        info = self.probe(url)
+
+        if not info['ranges']:
+            self.logger.info("Server does not support range requests, using a single stream")
+            digest = self.__download_stream(info['url'], path)
+            return {'size': os.path.getsize(path), 'etag': info['etag'], 'hash': digest}
+
+        manifest = self.__load_manifest(manifest_path, info)
+        if manifest and os.path.exists(path):
+            done = sum(s['done'] for s in manifest['segments'])
+            self.logger.info(f"Resuming download at {done}/{info['size']} bytes")
+        else:
+            manifest = self.__new_manifest(info)
+            with open(path, 'wb') as f:
+                if hasattr(os, 'posix_fallocate') and info['size']:
+                    os.posix_fallocate(f.fileno(), 0, info['size'])
+                else:
+                    f.truncate(info['size'])
+            self.__save_manifest(manifest_path, manifest)
+
+        tree = TreeHash(info['size'], manifest.get('leaves'))
+        pending = [s for s in manifest['segments'] if s['start'] + s['done'] <= s['end']]
+        with ThreadPoolExecutor(max_workers=len(pending) or 1) as pool:
+            results = list(pool.map(lambda s: self.__fetch_segment(info['url'], path, manifest_path, manifest, s, tree), pending))
+
+        if not all(results):
+            raise requests.exceptions.RequestException("Some segments could not be downloaded, progress kept for resume")
+
+        digest = tree.hexdigest()
+        if digest is None:
+            self.logger.debug("Download was resumed from an unaligned manifest, hashing the file")
+            digest = hash_file(path)
+        os.remove(manifest_path)
+        return {'size': info['size'], 'etag': info['etag'], 'hash': digest}
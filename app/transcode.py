@@ -0,0 +1,124 @@
+import base64
+import os
+import re
+import struct
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from tamga import Tamga
+
+
+LOUDNORM_FILTER = 'loudnorm=I=-16:TP=-1.5:LRA=11'
+
+
+@dataclass(frozen=True)
+class Profile:
+    name: str
+    extension: str
+    chapter_extension: str
+    sample_rate: int
+    encoders: tuple
+
+
+PROFILES = {
+    'm4b': Profile('m4b', '.m4b', '.m4a', 44100, (
+        ('libfdk_aac', ('-profile:a', 'aac_he', '-b:a', '48k')),
+        ('aac', ('-b:a', '64k')),
+    )),
+    'opus': Profile('opus', '.opus', '.opus', 48000, (
+        ('libopus', ('-b:a', '32k')),
+    )),
+}
+
+_encoders = None
+_encoders_lock = threading.Lock()
+
+
+def available_encoders():
+    """Names of the audio encoders the installed FFmpeg was built with"""
+    global _encoders
+    with _encoders_lock:
+        if _encoders is None:
+            result = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], capture_output=True, text=True)
+            _encoders = {
+                line.split()[1]
+                for line in result.stdout.splitlines()
+                if line.startswith(' A') and len(line.split()) > 1
+            }
+        return _encoders
+
+
+def cover_block(cover_path: str):
+    """Cover as a base64 METADATA_BLOCK_PICTURE comment, the way Ogg files carry pictures"""
+    with open(cover_path, 'rb') as f:
+        image = f.read()
+    mime = b'image/png' if image[:8] == b'\x89PNG\r\n\x1a\n' else b'image/jpeg'
+    description = b'Cover (front)'
+    block = (
+        struct.pack('>II', 3, len(mime)) + mime
+        + struct.pack('>I', len(description)) + description
+        + struct.pack('>IIIII', 0, 0, 0, 0, len(image)) + image
+    )
+    return base64.b64encode(block).decode('ascii')
+
+
+def _escape(value: str):
+    return re.sub(r'([=;#\\\n])', r'\\\1', value)
+
+
+def ogg_metadata(metadata: str, chapters: list, cover_path: str = None):
+    """
+    FFMETADATA for Ogg output: the global tags of `metadata` plus the chapters
+    as CHAPTERxxx comments and the cover as METADATA_BLOCK_PICTURE. FFmpeg's
+    Ogg muxer writes chapter starts up to a second late and can't attach
+    pictures, so both are passed as plain comments.
+    """
+    lines = [metadata.split('[CHAPTER]', 1)[0].rstrip('\n')]
+    for i, chapter in enumerate(chapters):
+        ms = int(chapter['start_ms'])
+        lines.append(f"CHAPTER{i:03d}={ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}")
+        lines.append(f"CHAPTER{i:03d}NAME={_escape(chapter['title'])}")
+    if cover_path:
+        lines.append(f"METADATA_BLOCK_PICTURE={_escape(cover_block(cover_path))}")
+    return '\n'.join(lines) + '\n'
+
+
+class ChapterTranscoder:
+    """
+    Encodes chapters with an output profile, one single-threaded FFmpeg
+    process per chapter and up to `workers` (default: CPU count) at a time,
+    optionally with EBU R128 loudness normalization of every chapter.
+    """
+
+    def __init__(self, profile: Profile, workers: int = None, loudnorm: bool = False, logger: Tamga = None):
+        self.profile = profile
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.loudnorm = loudnorm
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+
+    def encoder_args(self):
+        encoders = available_encoders()
+        for encoder, args in self.profile.encoders:
+            if encoder in encoders:
+                return ['-c:a', encoder, *args]
+        raise RuntimeError(f"FFmpeg has no encoder for the {self.profile.name} profile")
+
+    def __encode(self, source, target, encoder_args, consume):
+        args = ['ffmpeg', '-y', '-v', 'error', '-i', source, '-map', '0:a', '-map_metadata', '-1', '-threads', '1']
+        if self.loudnorm:
+            args += ['-af', LOUDNORM_FILTER]
+        args += ['-ar', str(self.profile.sample_rate), *encoder_args, target]
+        subprocess.run(args, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if consume:
+            os.remove(source)
+        return target
+
+    def transcode(self, sources: list, target_dir: str, consume: bool = False):
+        """Encoded chapter paths in the order of sources; raises CalledProcessError when one fails"""
+        encoder_args = self.encoder_args()
+        os.makedirs(target_dir, exist_ok=True)
+        targets = [os.path.join(target_dir, f"{i:04d}{self.profile.chapter_extension}") for i in range(len(sources))]
+        self.logger.info(f"Encoding {len(sources)} chapters to {self.profile.name} with {self.workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda pair: self.__encode(*pair, encoder_args, consume), zip(sources, targets)))
@@ -0,0 +1,191 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from tamga import Tamga
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    slug TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    owner TEXT,
+    expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS leases_owner ON leases (owner, status);
+"""
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Issues shared by several downloader instances through one SQLite file on
+    a common volume. A worker claims a slug with a lease that expires unless
+    it is renewed by heartbeats, so two instances never process the same
+    issue, and the issues of a worker that died are claimed again by another
+    one once its leases run out. Every claim and renewal is a short
+    `BEGIN IMMEDIATE` transaction, which SQLite serializes across processes
+    with file locks.
+    """
+
+    def __init__(self, path: str, worker_id: str = None, lease_seconds: float = 600, logger: Tamga = None):
+        self.path = path
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    @contextmanager
+    def __transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, slugs: list, unpublished=None):
+        """
+        Queue slugs that are not queued yet. A slug done earlier is queued
+        again when unpublished(slug) is true, e.g. after its podcast was
+        dropped from the library; the check runs inside the transaction, so
+        it can't race a worker that publishes and completes the slug.
+        """
+        now = time.time()
+        with self.__transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO leases (slug, status, updated_at) VALUES (?, 'queued', ?)",
+                [(slug, now) for slug in slugs],
+            )
+            if unpublished is None:
+                return
+            for slug in slugs:
+                row = conn.execute("SELECT status FROM leases WHERE slug = ?", (slug,)).fetchone()
+                if row['status'] == 'done' and unpublished(slug):
+                    self.logger.info(f"{slug} was done but is not published, queued again")
+                    conn.execute(
+                        "UPDATE leases SET status = 'queued', attempts = 0, updated_at = ? WHERE slug = ?", (now, slug)
+                    )
+
+    def claim(self, slug: str):
+        """True when this worker now holds the lease of slug: it was queued, its lease expired or it is ours already"""
+        now = time.time()
+        with self.__transaction() as conn:
+            conn.execute("INSERT OR IGNORE INTO leases (slug, status, updated_at) VALUES (?, 'queued', ?)", (slug, now))
+            row = conn.execute("SELECT status, owner, expires_at FROM leases WHERE slug = ?", (slug,)).fetchone()
+            if row['status'] == 'done':
+                return False
+            if row['status'] == 'claimed' and row['owner'] != self.worker_id and row['expires_at'] > now:
+                return False
+            if row['status'] == 'claimed' and row['owner'] != self.worker_id:
+                self.logger.warning(f"Lease of {slug} held by {row['owner']} expired, taking it over")
+            conn.execute(
+                "UPDATE leases SET status = 'claimed', owner = ?, expires_at = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE slug = ?",
+                (self.worker_id, now + self.lease_seconds, now, slug),
+            )
+        return True
+
+    def claims(self, slugs: list, stop_event: threading.Event = None):
+        """Yield the slugs this worker manages to claim, one at a time as the consumer asks for the next"""
+        for slug in slugs:
+            if stop_event and stop_event.is_set():
+                return
+            if self.claim(slug):
+                yield slug
+            else:
+                self.logger.info(f"{slug} is handled by another worker, skipping")
+
+    def heartbeat(self):
+        """Renew every lease this worker holds; returns how many it still holds"""
+        now = time.time()
+        with self.__transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE leases SET expires_at = ?, updated_at = ? WHERE owner = ? AND status = 'claimed'",
+                (now + self.lease_seconds, now, self.worker_id),
+            )
+        return cursor.rowcount
+
+    @contextmanager
+    def kept_alive(self, interval: float = None):
+        """Renew this worker's leases in the background while the block runs"""
+        interval = interval or self.lease_seconds / 3
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat()
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Lease heartbeat failed: {e}")
+
+        thread = threading.Thread(target=beat, name='lease-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
+
+    def attempts(self, slug: str):
+        """How many times slug has been claimed since it was queued"""
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM leases WHERE slug = ?", (slug,)).fetchone()
+        return row['attempts'] if row else 0
+
+    def holds(self, slug: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM leases WHERE slug = ? AND owner = ? AND status = 'claimed' AND expires_at > ?",
+                (slug, self.worker_id, time.time()),
+            ).fetchone()
+        return row is not None
+
+    def complete(self, slug: str):
+        with self.__transaction() as conn:
+            conn.execute(
+                "UPDATE leases SET status = 'done', owner = NULL, expires_at = NULL, updated_at = ? WHERE slug = ? AND owner = ?",
+                (time.time(), slug, self.worker_id),
+            )
+
+    def release(self, slug: str):
+        """Give a slug back to the queue, e.g. after a failure, so any worker can retry it"""
+        with self.__transaction() as conn:
+            conn.execute(
+                "UPDATE leases SET status = 'queued', owner = NULL, expires_at = NULL, updated_at = ? "
+                "WHERE slug = ? AND owner = ? AND status = 'claimed'",
+                (time.time(), slug, self.worker_id),
+            )
+
+    def requeue_expired(self):
+        """Put slugs whose lease ran out back in the queue; returns them"""
+        now = time.time()
+        with self.__transaction() as conn:
+            rows = conn.execute(
+                "SELECT slug, owner FROM leases WHERE status = 'claimed' AND expires_at <= ?", (now,)
+            ).fetchall()
+            conn.execute(
+                "UPDATE leases SET status = 'queued', owner = NULL, expires_at = NULL, updated_at = ? "
+                "WHERE status = 'claimed' AND expires_at <= ?",
+                (now, now),
+            )
+        for row in rows:
+            self.logger.warning(f"Lease of {row['slug']} held by {row['owner']} expired, back in the queue")
+        return [row['slug'] for row in rows]
@@ -0,0 +1,181 @@
+import os
+import struct
+import zlib
+from tamga import Tamga
+
+
+LOCAL_FILE_HEADER = b'PK\x03\x04'
+DATA_DESCRIPTOR = b'PK\x07\x08'
+CENTRAL_DIRECTORY = b'PK\x01\x02'
+END_OF_CENTRAL_DIRECTORY = b'PK\x05\x06'
+
+STORED = 0
+DEFLATED = 8
+
+
+class ZipStreamError(Exception):
+    pass
+
+
+class _ChunkReader:
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+        self.bytes_read = 0
+
+    def __fill(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return False
+            self.buffer += chunk
+        return True
+
+    def read_exact(self, size):
+        if not self.__fill(size):
+            raise ZipStreamError("Unexpected end of stream")
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.bytes_read += size
+        return data
+
+    def peek(self, size):
+        self.__fill(size)
+        return self.buffer[:size]
+
+    def read_some(self, limit=None):
+        if not self.buffer and not self.__fill(1):
+            return b''
+        if limit is None or limit >= len(self.buffer):
+            data, self.buffer = self.buffer, b''
+        else:
+            data, self.buffer = self.buffer[:limit], self.buffer[limit:]
+        self.bytes_read += len(data)
+        return data
+
+    def unread(self, data):
+        self.buffer = data + self.buffer
+        self.bytes_read -= len(data)
+
+
+class ZipStreamExtractor:
+    """
+    Extracts a zip archive from an iterable of byte chunks as they arrive,
+    reading the local file headers in order and verifying each member's CRC
+    inline. Nothing but the extracted members touches the disk.
+    """
+
+    def __init__(self, dest_dir: str, chunk_size: int = 256 * 1024, logger: Tamga = None):
+        self.dest_dir = dest_dir
+        self.chunk_size = chunk_size
+        self.logger = logger or Tamga(logToFile=False, logToJSON=False, logToConsole=True)
+
+    def __target_path(self, name):
+        normalized = os.path.normpath(name.replace('\\', '/'))
+        if os.path.isabs(normalized) or normalized.startswith('..'):
+            raise ZipStreamError(f"Unsafe member path: {name}")
+        return os.path.join(self.dest_dir, normalized)
+
+    def __zip64_sizes(self, extra, compressed_size, size):
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, data_size = struct.unpack('<HH', extra[offset:offset + 4])
+            data = extra[offset + 4:offset + 4 + data_size]
+            if header_id == 0x0001:
+                values = iter(struct.unpack(f'<{len(data) // 8}Q', data[:len(data) // 8 * 8]))
+                if size == 0xFFFFFFFF:
+                    size = next(values)
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = next(values)
+                return compressed_size, size, True
+            offset += 4 + data_size
+        return compressed_size, size, False
+
+    def __copy_stored(self, reader, out, remaining):
+        crc = 0
+        while remaining > 0:
+            data = reader.read_some(min(remaining, self.chunk_size))
+            if not data:
+                raise ZipStreamError("Unexpected end of stream")
+            crc = zlib.crc32(data, crc)
+            out.write(data)
+            remaining -= len(data)
+        return crc
+
+    def __copy_deflated(self, reader, out, remaining):
+        crc = 0
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        while not decompressor.eof:
+            data = reader.read_some(self.chunk_size if remaining is None else min(remaining, self.chunk_size))
+            if not data:
+                raise ZipStreamError("Unexpected end of stream")
+            if remaining is not None:
+                remaining -= len(data)
+            output = decompressor.decompress(data)
+            crc = zlib.crc32(output, crc)
+            out.write(output)
+        if decompressor.unused_data:
+            reader.unread(decompressor.unused_data)
+        return crc
+
+    def __read_data_descriptor(self, reader, zip64):
+        if reader.peek(4) == DATA_DESCRIPTOR:
+            reader.read_exact(4)
+        if zip64:
+            crc, compressed_size, size = struct.unpack('<IQQ', reader.read_exact(20))
+        else:
+            crc, compressed_size, size = struct.unpack('<III', reader.read_exact(12))
+        return crc
+
+    def extract(self, chunks):
+        reader = _ChunkReader(chunks)
+        os.makedirs(self.dest_dir, exist_ok=True)
+        extracted = []
+
+        while True:
+            signature = reader.peek(4)
+            if signature in (CENTRAL_DIRECTORY, END_OF_CENTRAL_DIRECTORY, b''):
+                break
+            if signature != LOCAL_FILE_HEADER:
+                raise ZipStreamError(f"Unexpected signature {signature!r}")
+
+            header = reader.read_exact(30)
+            (_, _, flags, method, _, _, crc, compressed_size, size,
+             name_length, extra_length) = struct.unpack('<4sHHHHHIIIHH', header)
+            raw_name = reader.read_exact(name_length)
+            extra = reader.read_exact(extra_length)
+            name = raw_name.decode('utf-8' if flags & 0x800 else 'cp437')
+            compressed_size, size, zip64 = self.__zip64_sizes(extra, compressed_size, size)
+            has_descriptor = bool(flags & 0x08)
+
+            if flags & 0x01:
+                raise ZipStreamError(f"Encrypted member not supported: {name}")
+            if method not in (STORED, DEFLATED):
+                raise ZipStreamError(f"Unsupported compression method {method} for {name}")
+            if method == STORED and has_descriptor and compressed_size == 0:
+                raise ZipStreamError(f"Stored member without sizes cannot be streamed: {name}")
+
+            target = self.__target_path(name)
+            if name.endswith('/'):
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+
+            temp_target = target + '.partial'
+            with open(temp_target, 'wb') as out:
+                if method == STORED:
+                    actual_crc = self.__copy_stored(reader, out, compressed_size)
+                else:
+                    actual_crc = self.__copy_deflated(reader, out, None if has_descriptor else compressed_size)
+
+            if has_descriptor:
+                crc = self.__read_data_descriptor(reader, zip64)
+            if actual_crc != crc:
+                os.remove(temp_target)
+                raise ZipStreamError(f"CRC mismatch for {name}")
+
+            os.replace(temp_target, target)
+            extracted.append(name)
+            self.logger.debug(f"Extracted member: {name}")
+
+        return extracted
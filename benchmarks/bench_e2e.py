@@ -0,0 +1,235 @@
+"""
+End-to-end benchmark against the local Audioteka stand-in (standin_server.py)
+with synthetic issues (fixtures.py), so no account or network is needed.
+
+For every issue size it times, best of --repeat:
+
+    metadata   AudiotekaBook(slug): product page fetch and parse
+    download   AudiotekaBook.download_file
+    extract    AudiotekaBook.extract_zip
+    merge      CreatePodcast.make
+    main       the whole main.main flow for --issues new issues, run in a
+               fresh interpreter because main.py reads its configuration
+               at import time; its per-stage metrics are kept as well. It
+               runs with --backfill over those issues, since a run on an
+               empty library only takes the newest one
+
+Each run is appended to --results as one JSON line and compared with the
+previous run of the same configuration; slowdowns beyond --tolerance are
+reported and make the exit status 1.
+
+    python benchmarks/bench_e2e.py --sizes 10,40 --chapter-minutes 3 --repeat 3
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+import requests
+from requests.cookies import create_cookie
+from tamga import Tamga
+
+from audioteka_book import AudiotekaBook
+from cookie_cache import CookieCache
+from create_podcast import CreatePodcast
+from http_cache import HttpCache
+from library_index import parse_version
+from fixtures import make_issues
+from standin_server import SESSION_COOKIE, StandinServer
+
+
+def session_cookie():
+    return create_cookie(*SESSION_COOKIE, domain='127.0.0.1', path='/')
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def bench_book(server, issue, work_dir, backend, logger):
+    """Time the stages of one issue driven directly through AudiotekaBook and CreatePodcast"""
+    session = requests.Session()
+    session.cookies.set_cookie(session_cookie())
+    http = HttpCache(ttl=0, logger=logger)
+    timings = {}
+
+    ab, timings['metadata'] = timed(lambda: AudiotekaBook(issue.slug, work_dir, logger, http, server.base_url))
+    ok, timings['download'] = timed(lambda: ab.download_file(session))
+    if not ok:
+        raise RuntimeError(f"Download of {issue.slug} failed")
+    ok, timings['extract'] = timed(ab.extract_zip)
+    if not ok:
+        raise RuntimeError(f"Extraction of {issue.slug} failed")
+    cp = CreatePodcast(ab.create_podcast_data(), logger, backend=backend)
+    ok, timings['merge'] = timed(cp.make)
+    if not ok:
+        raise RuntimeError(f"Merge of {issue.slug} failed")
+    return timings, os.path.getsize(cp.pd.output_path)
+
+
+def bench_main(server, root, backend, issues):
+    """Run main.py once against the stand-in; seconds, per-stage metric totals and the error, if any"""
+    work_dir = os.path.join(root, 'work')
+    out_dir = os.path.join(root, 'out')
+    os.makedirs(work_dir)
+    os.makedirs(out_dir)
+    cookie_path = os.path.join(root, 'cookies.json')
+    CookieCache(cookie_path, logger=Tamga(logToFile=False, logToJSON=False, logToConsole=False)).save([session_cookie()])
+    metrics_path = os.path.join(root, 'metrics.jsonl')
+
+    env = dict(
+        os.environ,
+        email='bench@example.com',
+        password='bench',
+        respekt_folder=out_dir,
+        download_directory=work_dir,
+        audioteka_base_url=server.base_url,
+        cookie_cache=cookie_path,
+        merge_backend=backend,
+        http_cache_ttl='0',
+        metrics_file=metrics_path,
+    )
+    started = time.perf_counter()
+    versions = sorted(parse_version(issue.slug) for issue in issues)
+    backfill = [f"{year}-{week}" for year, week in (versions[0], versions[-1])]
+    result = subprocess.run([sys.executable, os.path.join(APP_DIR, 'main.py'), '--backfill', *backfill], cwd=root, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+
+    published = [name for name in os.listdir(out_dir) if name.endswith('.mp3')]
+    error = None
+    if result.returncode != 0:
+        error = (result.stderr.strip().splitlines() or ['exit status %d' % result.returncode])[-1]
+    stages = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                span = json.loads(line)
+                stages[span['stage']] = stages.get(span['stage'], 0.0) + span['seconds']
+    return elapsed, stages, len(published), error
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_result(path, config):
+    if not os.path.exists(path):
+        return None
+    previous = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('config') == config:
+                previous = record
+    return previous
+
+
+def run_size(args, chapters, logger):
+    minutes = chapters * args.chapter_minutes
+    with tempfile.TemporaryDirectory() as root:
+        fixtures_dir = os.path.join(root, 'fixtures')
+        issues, fixture_seconds = timed(lambda: make_issues(fixtures_dir, max(1, args.issues), chapters=chapters, minutes=minutes))
+        print(f"{chapters} chapters, {minutes:g} min: fixtures built in {fixture_seconds:.2f}s, zip {os.path.getsize(issues[0].zip_path) / 2 ** 20:.1f} MB")
+
+        with StandinServer(issues, latency=args.latency, rate=args.rate) as server:
+            book_runs = []
+            for n in range(args.repeat):
+                book_runs.append(bench_book(server, issues[0], os.path.join(root, f'book{n}'), args.backend, logger))
+            timings = {stage: min(run[0][stage] for run in book_runs) for stage in book_runs[0][0]}
+            output_size = book_runs[0][1]
+
+            main_runs = []
+            if args.issues:
+                for n in range(args.repeat):
+                    run_root = os.path.join(root, f'main{n}')
+                    os.makedirs(run_root)
+                    main_runs.append(bench_main(server, run_root, args.backend, issues))
+                    if main_runs[-1][3]:
+                        break
+            ok_runs = [run for run in main_runs if not run[3]]
+            if ok_runs:
+                best = min(ok_runs, key=lambda run: run[0])
+                timings['main'] = best[0]
+                for stage, seconds in best[1].items():
+                    timings[f'main.{stage}'] = seconds
+                if best[2] != args.issues:
+                    print(f"  main published {best[2]} of {args.issues} issues")
+            elif main_runs:
+                print(f"  main failed: {main_runs[-1][3]}")
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {
+            'chapters': chapters,
+            'minutes': minutes,
+            'issues': args.issues,
+            'backend': args.backend,
+            'latency': args.latency,
+            'rate': args.rate,
+        },
+        'zip_size': os.path.getsize(issues[0].zip_path) if os.path.exists(issues[0].zip_path) else None,
+        'output_size': output_size,
+        'seconds': timings,
+    }
+
+
+def report(record, previous, tolerance):
+    regressions = []
+    for stage, seconds in record['seconds'].items():
+        line = f"  {stage:<24}{seconds:9.3f}s"
+        before = previous['seconds'].get(stage) if previous else None
+        if before:
+            change = (seconds - before) / before
+            line += f"  {change:+7.1%} vs {previous['commit'] or 'previous'}"
+            if change > tolerance and seconds - before > 0.05:
+                line += '  REGRESSION'
+                regressions.append(stage)
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10,40', help='comma separated chapter counts')
+    parser.add_argument('--chapter-minutes', type=float, default=3)
+    parser.add_argument('--issues', type=int, default=2, help='new issues for the main flow, 0 to skip it')
+    parser.add_argument('--backend', default='native', choices=('ffmpeg', 'native'))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the stand-in adds to every response')
+    parser.add_argument('--rate', type=int, default=0, help='stand-in download bytes per second, 0 for unlimited')
+    parser.add_argument('--results', default=os.path.join(BENCH_DIR, 'results.jsonl'))
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown reported as a regression')
+    args = parser.parse_args()
+
+    logger = Tamga(logToFile=False, logToJSON=False, logToConsole=False)
+    regressions = []
+    for chapters in (int(size) for size in args.sizes.split(',')):
+        record = run_size(args, chapters, logger)
+        previous = previous_result(args.results, record['config'])
+        regressions += [f"{chapters} chapters: {stage}" for stage in report(record, previous, args.tolerance)]
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
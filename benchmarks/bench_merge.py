@@ -0,0 +1,91 @@
+"""
+Compare the merge paths of CreatePodcast.make: the two-pass and single-pass
+FFmpeg merge and the native in-process MP3 concatenator, and optionally the
+transcoding output profiles (--profiles m4b,opus).
+
+Synthesizes an issue of silent MP3 chapters (2 hours by default) and reports
+wall time and the bytes read/written by the merge, taken from /proc/self/io,
+which includes the I/O of reaped child processes.
+
+    python benchmarks/bench_merge.py --minutes 120 --chapters 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from create_podcast import CreatePodcast, PodcastData
+
+
+def read_io():
+    counters = {}
+    with open('/proc/self/io', 'r') as f:
+        for line in f:
+            key, value = line.split(':')
+            counters[key] = int(value)
+    return counters
+
+
+def make_issue(folder, minutes, chapters, bitrate):
+    chapter_seconds = minutes * 60 / chapters
+    with open(os.path.join(folder, 'playlist.pls'), 'w', encoding='utf-8') as pls:
+        pls.write(f"[playlist]\nNumberOfEntries={chapters}\n")
+        for i in range(1, chapters + 1):
+            name = f"{i:02d}.mp3"
+            subprocess.run([
+                'ffmpeg', '-y', '-v', 'error',
+                '-f', 'lavfi', '-i', 'anullsrc=r=44100:cl=mono',
+                '-t', str(chapter_seconds),
+                '-b:a', bitrate,
+                os.path.join(folder, name),
+            ], check=True)
+            pls.write(f"File{i}={name}\nTitle{i}=Chapter {i}\nLength{i}={int(chapter_seconds * 1000)}\n")
+
+
+def run(folder, single_pass, backend, profile='mp3'):
+    output = os.path.join(folder, f"merged_{backend}_{profile}_{'single' if single_pass else 'two'}.mp3")
+    pd = PodcastData(folder, os.path.join(folder, 'playlist.pls'), output, 'Benchmark', 'Respekt', 'Respekt', '2025-01-01', None, 'Benchmark issue')
+    before = read_io()
+    started = time.perf_counter()
+    ok = CreatePodcast(pd, single_pass=single_pass, backend=backend, profile=profile).make()
+    elapsed = time.perf_counter() - started
+    after = read_io()
+    size = os.path.getsize(pd.output_path) if ok else 0
+    if os.path.exists(pd.output_path):
+        os.remove(pd.output_path)
+    return {
+        'ok': ok,
+        'seconds': elapsed,
+        'read': after['rchar'] - before['rchar'],
+        'written': after['wchar'] - before['wchar'],
+        'size': size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--minutes', type=int, default=120)
+    parser.add_argument('--chapters', type=int, default=30)
+    parser.add_argument('--bitrate', default='64k')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--profiles', default='', help='comma separated output profiles to time as well, e.g. m4b,opus')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        make_issue(folder, args.minutes, args.chapters, args.bitrate)
+        paths = [('two-pass', False, 'ffmpeg', 'mp3'), ('single-pass', True, 'ffmpeg', 'mp3'), ('native', True, 'native', 'mp3')]
+        paths += [(profile, True, 'ffmpeg', profile) for profile in args.profiles.split(',') if profile]
+        for label, single_pass, backend, profile in paths:
+            results = [run(folder, single_pass, backend, profile) for _ in range(args.repeat)]
+            best = min(results, key=lambda r: r['seconds'])
+            mb = 1024 * 1024
+            print(f"{label:12} {best['seconds']:7.2f}s  read {best['read'] / mb:8.1f} MB  "
+                  f"written {best['written'] / mb:8.1f} MB  output {best['size'] / mb:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare next_data.extract_page_prop with the BeautifulSoup parse it replaced.
+
+Pass saved catalog/product pages as arguments, otherwise a catalog-sized page
+is synthesized.
+
+    python benchmarks/bench_next_data.py saved/katalog.html saved/audiokniha.html
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+from next_data import extract_next_data
+
+
+def synthetic_page(products=30, filler_kb=600):
+    data = {
+        'props': {
+            'pageProps': {
+                'productList': {
+                    '_embedded': {
+                        'app:product': [
+                            {'slug': f'respekt-{week:02d}-2025', 'name': f'Respekt {week}/2025', 'description': 'x' * 2000}
+                            for week in range(1, products + 1)
+                        ],
+                    },
+                },
+            },
+        },
+    }
+    filler = '<div class="card"><span>' + 'lorem ipsum ' * 8 + '</span></div>\n'
+    body = filler * (filler_kb * 1024 // len(filler))
+    return (
+        '<html><head><title>Respekt</title></head><body>' + body +
+        '<script id="__NEXT_DATA__" type="application/json">' + json.dumps(data) + '</script>'
+        '</body></html>'
+    ).encode('utf-8')
+
+
+def bs4_extract(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html.decode('utf-8'), 'html.parser')
+    script_tag = soup.find('script', {'id': '__NEXT_DATA__'})
+    return json.loads(script_tag.string)
+
+
+def measure(func, html, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(html)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('pages', nargs='*')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, 'rb').read()) for path in args.pages] or [('synthetic', synthetic_page())]
+    for name, html in pages:
+        assert extract_next_data(html) is not None, f"No __NEXT_DATA__ in {name}"
+        fast = measure(extract_next_data, html, args.repeat)
+        line = f"{name}: {len(html) / 1024:.0f} KB  next_data {fast * 1000:.2f} ms"
+        try:
+            slow = measure(bs4_extract, html, max(1, args.repeat // 4))
+            line += f"  bs4 {slow * 1000:.2f} ms  speedup {slow / fast:.0f}x"
+        except ImportError:
+            line += "  (bs4 not installed)"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Startup benchmark of the "nothing new" path: `main.py --check` against the
+local stand-in (standin_server.py) with the newest issue already in the
+podcasts folder, run in a fresh interpreter every time.
+
+It records, best of --repeat:
+
+    check      wall time of `python main.py --check` until it exits
+    import     import time of the modules main.py loads (-X importtime), not
+               counting those the interpreter itself loads at startup
+
+and fails when one of the modules that only processing needs (the browser,
+zip extraction, encoding detection, merging) gets imported on that path.
+Each run is appended to --results and compared with the previous one;
+slowdowns beyond --tolerance are reported and make the exit status 1.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+from fixtures import make_issues
+from standin_server import StandinServer
+from bench_e2e import git_commit, previous_result
+
+PROCESSING_MODULES = (
+    'nodriver',
+    'cookie_manager',
+    'audioteka_book',
+    'create_podcast',
+    'zip_stream',
+    'transcode',
+    'mp3_concat',
+    'playlist',
+    'pipeline',
+    'bs4',
+)
+IMPORT_LINE = re.compile(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)')
+
+
+def top_level_imports(stderr):
+    """{module: cumulative µs} of the modules imported directly by the script"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match and len(match.group(2)) == 1:
+            modules[match.group(3)] = int(match.group(1))
+    return modules
+
+
+def startup_modules():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'], capture_output=True, text=True)
+    return set(top_level_imports(result.stderr))
+
+
+def run_check(server, root, importtime=False):
+    """Exit status, seconds and, with importtime, the -X importtime report of one `main.py --check`"""
+    env = dict(
+        os.environ,
+        respekt_folder=os.path.join(root, 'out'),
+        download_directory=os.path.join(root, 'work'),
+        audioteka_base_url=server.base_url,
+        http_cache_ttl='0',
+    )
+    args = [sys.executable]
+    if importtime:
+        args += ['-X', 'importtime']
+    started = time.perf_counter()
+    result = subprocess.run([*args, os.path.join(APP_DIR, 'main.py'), '--check'], cwd=root, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    return result.returncode, elapsed, result.stderr if importtime else ''
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the stand-in adds to every response')
+    parser.add_argument('--results', default=os.path.join(BENCH_DIR, 'startup_results.jsonl'))
+    parser.add_argument('--tolerance', type=float, default=0.2, help='slowdown reported as a regression')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        issues = make_issues(os.path.join(root, 'fixtures'), 2, chapters=1, minutes=0.1)
+        for name in ('out', 'work'):
+            os.makedirs(os.path.join(root, name))
+        with StandinServer(issues, latency=args.latency) as server:
+            status, _, _ = run_check(server, root)
+            if status != 0:
+                sys.exit(f"--check found nothing new in an empty folder (exit status {status})")
+            os.remove(os.path.join(root, 'work', 'library.sqlite'))
+            open(os.path.join(root, 'out', f"{issues[0].slug}.mp3"), 'wb').close()
+
+            runs = [run_check(server, root) for _ in range(args.repeat)]
+            if any(status != 1 for status, _, _ in runs):
+                sys.exit(f"--check found new issues although the newest one is published (exit status {runs[0][0]})")
+            reports = [run_check(server, root, importtime=True)[2] for _ in range(args.repeat)]
+
+    startup = startup_modules()
+    imported = [
+        {module: us for module, us in top_level_imports(report).items() if module not in startup}
+        for report in reports
+    ]
+    every_module = {match.group(3) for match in IMPORT_LINE.finditer(reports[0])}
+    loaded = sorted(module for module in PROCESSING_MODULES if module in every_module)
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'config': {'latency': args.latency},
+        'seconds': {
+            'check': min(seconds for _, seconds, _ in runs),
+            'import': min(sum(modules.values()) for modules in imported) / 1e6,
+        },
+        'processing_imports': loaded,
+    }
+    previous = previous_result(args.results, record['config'])
+    regressions = []
+    for stage, seconds in record['seconds'].items():
+        line = f"  {stage:<10}{seconds:9.3f}s"
+        before = previous['seconds'].get(stage) if previous else None
+        if before:
+            change = (seconds - before) / before
+            line += f"  {change:+7.1%} vs {previous['commit'] or 'previous'}"
+            if change > args.tolerance and seconds - before > 0.02:
+                line += '  REGRESSION'
+                regressions.append(stage)
+        print(line)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+    if loaded:
+        print(f"Imported on the check path: {', '.join(loaded)}")
+        sys.exit(1)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
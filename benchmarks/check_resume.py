@@ -0,0 +1,109 @@
+"""
+Checks interrupted and resumed segmented downloads against the local
+stand-in (standin_server.py). The stand-in cuts download responses off in
+the middle of hash leaves, and for each case the downloaded bytes and the
+TreeHash digest computed while downloading must match the source file and
+content_hash.hash_file:
+
+    retry      a segment is cut off and retried by the same downloader
+    short      a segment ends early without an error and is retried
+    resume     the first download gives up, a new downloader resumes it
+               from the .part manifest and re-reads the started leaves
+
+The exit status is 1 when a case fails.
+
+    python benchmarks/check_resume.py
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, '..', 'app')
+sys.path.insert(0, APP_DIR)
+
+import requests
+from tamga import Tamga
+
+import segmented_download
+from content_hash import LEAF_SIZE, hash_file
+from segmented_download import SegmentedDownloader
+from bench_e2e import session_cookie
+from fixtures import make_issues
+from standin_server import StandinServer
+
+
+def no_file_hash(path):
+    raise AssertionError("digest fell back to reading the file instead of the TreeHash")
+
+
+def session():
+    s = requests.Session()
+    s.cookies.set_cookie(session_cookie())
+    return s
+
+
+def run_case(name, issue, drops, attempts, work_dir, logger, clean_drops=False):
+    """Download issue's archive with the stand-in dropping at `drops`; (ok, message)"""
+    url_path = f'/cz/v2/me/audiobooks/{issue.id}/download'
+    target = os.path.join(work_dir, f'{name}.zip')
+    with StandinServer([issue], drops=drops, clean_drops=clean_drops) as server:
+        url = server.base_url + url_path
+        result = None
+        for attempt in range(attempts):
+            downloader = SegmentedDownloader(session(), segments=4, retries=1 if attempt + 1 < attempts else 3, logger=logger)
+            try:
+                result = downloader.download(url, target)
+                break
+            except requests.exceptions.RequestException:
+                if not os.path.exists(target + '.part'):
+                    return False, "no .part manifest kept after the interrupted attempt"
+        if result is None:
+            return False, "download did not finish"
+        if server.server.RequestHandlerClass.drops:
+            return False, f"stand-in never reached drop offsets {server.server.RequestHandlerClass.drops}"
+
+    with open(issue.zip_path, 'rb') as f:
+        expected = f.read()
+    with open(target, 'rb') as f:
+        if f.read() != expected:
+            return False, "downloaded bytes differ from the source"
+    if result['hash'] != hash_file(issue.zip_path):
+        return False, "TreeHash digest differs from hash_file"
+    return True, f"{len(expected)} bytes, digest {result['hash'][:16]}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=3 * LEAF_SIZE + 12345, help='archive size in bytes')
+    args = parser.parse_args()
+
+    logger = Tamga(logToFile=False, logToJSON=False, logToConsole=False)
+    segmented_download.hash_file = no_file_hash
+    failed = []
+    with tempfile.TemporaryDirectory() as root:
+        issue = make_issues(os.path.join(root, 'fixtures'), 1, chapters=1, minutes=0.1)[0]
+        with open(issue.zip_path, 'wb') as f:
+            f.write(os.urandom(args.size))
+        mid_leaf = LEAF_SIZE + LEAF_SIZE // 2 + 4321
+        cases = (
+            ('retry', (mid_leaf, 2 * LEAF_SIZE + 777), 1, False),
+            ('short', (mid_leaf, 2 * LEAF_SIZE + 777), 1, True),
+            ('resume', (mid_leaf, LEAF_SIZE // 3 + 1), 2, False),
+        )
+        for name, drops, attempts, clean_drops in cases:
+            try:
+                ok, message = run_case(name, issue, drops, attempts, root, logger, clean_drops)
+            except AssertionError as e:
+                ok, message = False, str(e)
+            print(f"  {name:<8}{'ok' if ok else 'FAILED'}  {message}")
+            if not ok:
+                failed.append(name)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
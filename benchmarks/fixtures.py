@@ -0,0 +1,117 @@
+"""
+Synthetic Respekt issues for the benchmarks: silent MP3 chapters, a
+`playlist.pls` in a chosen encoding, a cover and the zip Audioteka serves.
+
+The chapters are written frame by frame (MPEG-1 Layer III, 44.1 kHz mono,
+all-zero side info, which decodes as silence), so issues of any length are
+built in well under a second and without FFmpeg.
+"""
+import os
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+
+SAMPLE_RATE = 44100
+SAMPLES_PER_FRAME = 1152
+BITRATE_INDEX = {32: 1, 40: 2, 48: 3, 56: 4, 64: 5, 80: 6, 96: 7, 112: 8, 128: 9}
+
+ENCODINGS = ('utf-8', 'utf-8-sig', 'cp1250', 'utf-16')
+TITLE = 'Kapitola {}: Příliš žluťoučký kůň úpěl ďábelské ódy'
+
+
+@dataclass
+class Issue:
+    slug: str
+    id: str
+    name: str
+    created_at: datetime
+    folder: str
+    zip_path: str
+    cover_path: str
+    chapters: list = field(default_factory=list)
+
+
+def silent_frame(bitrate: int = 64):
+    """One silent frame, without padding"""
+    header = struct.pack('>I', 0xFFFB0000 | BITRATE_INDEX[bitrate] << 12 | 0xC4)
+    size = 144 * bitrate * 1000 // SAMPLE_RATE
+    return header + bytes(size - len(header))
+
+
+def write_chapter(path: str, seconds: float, bitrate: int = 64):
+    frames = int(seconds * SAMPLE_RATE / SAMPLES_PER_FRAME)
+    frame = silent_frame(bitrate)
+    batch = frame * 256
+    with open(path, 'wb') as f:
+        for _ in range(frames // 256):
+            f.write(batch)
+        f.write(frame * (frames % 256))
+    return frames * SAMPLES_PER_FRAME * 1000 // SAMPLE_RATE
+
+
+def write_playlist(path: str, chapters: list, encoding: str = 'utf-8', lengths: bool = True):
+    lines = ['[playlist]', f'NumberOfEntries={len(chapters)}']
+    for i, (name, title, length_ms) in enumerate(chapters, 1):
+        lines.append(f'File{i}={name}')
+        lines.append(f'Title{i}={title}')
+        lines.append(f'Length{i}={length_ms if lengths else -1}')
+    lines.append('Version=2')
+    text = '\r\n'.join(lines) + '\r\n'
+    with open(path, 'wb') as f:
+        f.write(text.encode(encoding))
+
+
+def _png_chunk(kind: bytes, data: bytes):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def write_cover(path: str, size: int = 600):
+    """A flat red PNG of size x size pixels"""
+    row = b'\x00' + b'\xc0\x10\x20' * size
+    pixels = zlib.compress(row * size, 9)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', size, size, 8, 2, 0, 0, 0)))
+        f.write(_png_chunk(b'IDAT', pixels))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def make_issue(root: str, year: int, week: int, chapters: int = 20, minutes: float = 60, bitrate: int = 64, encoding: str = 'utf-8', lengths: bool = True):
+    """Build the folder, cover and zip of one issue under root and describe it"""
+    slug = f'respekt-{week}-{year}'
+    name = f'Respekt {week} {year}'
+    folder = os.path.join(root, slug)
+    os.makedirs(folder, exist_ok=True)
+
+    entries = []
+    for i in range(1, chapters + 1):
+        filename = f'{i:02d}.mp3'
+        length_ms = write_chapter(os.path.join(folder, filename), minutes * 60 / chapters, bitrate)
+        entries.append((filename, TITLE.format(i), length_ms))
+    write_playlist(os.path.join(folder, 'playlist.pls'), entries, encoding, lengths)
+
+    cover_path = os.path.join(root, f'{slug}.png')
+    write_cover(cover_path)
+
+    zip_path = os.path.join(root, f'{slug}.zip')
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as archive:
+        for filename, _, _ in entries:
+            archive.write(os.path.join(folder, filename), filename)
+        archive.write(os.path.join(folder, 'playlist.pls'), 'playlist.pls')
+
+    created_at = datetime.fromisocalendar(year, week, 4).replace(hour=6, tzinfo=timezone.utc)
+    return Issue(slug, f'{year}{week:02d}', name, created_at, folder, zip_path, cover_path, entries)
+
+
+def make_issues(root: str, count: int, newest: tuple = (2025, 30), **kwargs):
+    """`count` consecutive weekly issues ending at newest (year, week), newest first"""
+    monday = datetime.fromisocalendar(newest[0], newest[1], 1)
+    encoding = kwargs.pop('encoding', None)
+    issues = []
+    for n in range(count):
+        year, week, _ = (monday - timedelta(weeks=n)).isocalendar()
+        issues.append(make_issue(root, year, week, encoding=encoding or ENCODINGS[n % len(ENCODINGS)], **kwargs))
+    return issues
@@ -0,0 +1,258 @@
+"""
+Local stand-in for the parts of audioteka.com the pipeline talks to:
+
+    /cz/katalog/respekt/?page=N&limit=M       catalog page with productList
+    /cz/audiokniha/{slug}/                    product page with the audiobook
+    /cz/v2/me                                 session probe, 200 when logged in
+    /cz/v2/me/audiobooks/{id}/download        the issue zip, with Range support
+    /covers/{slug}.png                        cover image
+
+Pages carry their data in `<script id="__NEXT_DATA__">` like the real site
+and answer If-None-Match with 304. Requests need the `SESSION_COOKIE`
+cookie where the real site needs a login. `latency` delays every response
+and `rate` caps the download speed in bytes per second, to get closer to
+a real connection. Each offset in `drops` cuts the first download
+response that covers it off at that offset, like a dropped connection;
+with `clean_drops` the response instead announces the shorter length and
+ends cleanly, like a server that closes early without an error.
+
+    python benchmarks/standin_server.py --issues 8 --port 8765
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fixtures import make_issues
+
+
+SESSION_COOKIE = ('bench_session', 'standin')
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+PAGE_TEMPLATE = (
+    '<!DOCTYPE html><html><head><title>Audioteka</title></head><body>'
+    '<div id="__next"></div>'
+    '<script id="__NEXT_DATA__" type="application/json">{}</script>'
+    '</body></html>'
+)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    issues = ()
+    latency = 0.0
+    rate = 0
+    stats = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def __count(self, kind, sent=0):
+        with self.stats['lock']:
+            self.stats['requests'][kind] = self.stats['requests'].get(kind, 0) + 1
+            self.stats['bytes'] += sent
+
+    def __logged_in(self):
+        name, value = SESSION_COOKIE
+        return f'{name}={value}' in self.headers.get('Cookie', '')
+
+    def __empty(self, code, headers=()):
+        self.send_response(code)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def __page(self, kind, page_props):
+        data = {'props': {'pageProps': page_props}, 'page': kind, 'buildId': 'standin'}
+        body = PAGE_TEMPLATE.format(json.dumps(data, ensure_ascii=False)).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.__count(kind)
+            return self.__empty(304, [('ETag', etag)])
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+        self.__count(kind, len(body))
+
+    def __base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    def __product(self, issue):
+        return {
+            'id': issue.id,
+            'slug': issue.slug,
+            'name': issue.name,
+            'kind': 'audiobook',
+            'image_url': f'{self.__base_url()}/covers/{issue.slug}.png',
+            'description': f'{issue.name}, synthetic issue with {len(issue.chapters)} chapters',
+            'created_at': issue.created_at.isoformat(),
+            '_embedded': {
+                'app:author': [{'name': 'Respekt'}],
+                'app:contained-in': [{'name': 'Respekt'}],
+            },
+        }
+
+    def __catalog(self, query):
+        page = int(query.get('page', ['1'])[0])
+        limit = int(query.get('limit', ['30'])[0])
+        products = [self.__product(issue) for issue in self.issues[(page - 1) * limit:page * limit]]
+        self.__page('catalog', {'productList': {
+            '_embedded': {'app:product': products},
+            'total': len(self.issues),
+            'pages': max(1, -(-len(self.issues) // limit)),
+        }})
+
+    def __send_file(self, kind, path, content_type):
+        size = os.path.getsize(path)
+        start, end, status = 0, size - 1, 200
+        match = RANGE_PATTERN.match(self.headers.get('Range', '').strip())
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+            if start > end:
+                return self.__empty(416, [('Content-Range', f'bytes */{size}')])
+            status = 206
+
+        remaining = end - start + 1
+        if kind == 'download':
+            with self.stats['lock']:
+                drop = next((offset for offset in self.drops if start <= offset <= end), None)
+                if drop is not None:
+                    self.drops.remove(drop)
+                    remaining = drop - start
+                    self.close_connection = True
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(remaining if self.clean_drops else end - start + 1))
+        self.send_header('ETag', f'"{int(os.path.getmtime(path))}-{size}"')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        self.end_headers()
+
+        started = time.monotonic()
+        sent = 0
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(remaining, 64 * 1024))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+                sent += len(chunk)
+                if self.rate:
+                    ahead = sent / self.rate - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        self.__count(kind, sent)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        path = url.path
+        by_slug = {issue.slug: issue for issue in self.issues}
+        by_id = {issue.id: issue for issue in self.issues}
+        try:
+            if path == '/cz/katalog/respekt/':
+                return self.__catalog(parse_qs(url.query))
+            match = re.fullmatch(r'/cz/audiokniha/([^/]+)/', path)
+            if match and match.group(1) in by_slug:
+                return self.__page('product', {'audiobook': self.__product(by_slug[match.group(1)])})
+            match = re.fullmatch(r'/covers/([^/]+)\.png', path)
+            if match and match.group(1) in by_slug:
+                return self.__send_file('cover', by_slug[match.group(1)].cover_path, 'image/png')
+            if path == '/cz/v2/me':
+                self.__count('me')
+                return self.__empty(200 if self.__logged_in() else 401)
+            match = re.fullmatch(r'/cz/v2/me/audiobooks/([^/]+)/download', path)
+            if match and match.group(1) in by_id:
+                if not self.__logged_in():
+                    return self.__empty(401)
+                return self.__send_file('download', by_id[match.group(1)].zip_path, 'application/zip')
+            self.__empty(404)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class StandinServer:
+    """Serves `issues` (newest first) from a background thread on 127.0.0.1"""
+
+    def __init__(self, issues, port: int = 0, latency: float = 0.0, rate: int = 0, drops: tuple = (), clean_drops: bool = False):
+        self.stats = {'lock': threading.Lock(), 'requests': {}, 'bytes': 0}
+        handler = type('Handler', (StandinHandler,), {
+            'issues': tuple(issues),
+            'latency': latency,
+            'rate': rate,
+            'drops': list(drops),
+            'clean_drops': clean_drops,
+            'stats': self.stats,
+        })
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def reset_stats(self):
+        with self.stats['lock']:
+            self.stats['requests'] = {}
+            self.stats['bytes'] = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='standin', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--issues', type=int, default=4)
+    parser.add_argument('--chapters', type=int, default=20)
+    parser.add_argument('--minutes', type=float, default=60)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--rate', type=int, default=0, help='download bytes per second, 0 for unlimited')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        issues = make_issues(root, args.issues, chapters=args.chapters, minutes=args.minutes)
+        server = StandinServer(issues, args.port, args.latency, args.rate)
+        print(f'Serving {len(issues)} issues on {server.base_url}, cookie {SESSION_COOKIE[0]}={SESSION_COOKIE[1]}')
+        try:
+            server.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
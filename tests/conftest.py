@@ -0,0 +1,12 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app'))
+
+import pytest
+from tamga import Tamga
+
+
+@pytest.fixture
+def logger():
+    return Tamga(logToFile=False, logToJSON=False, logToConsole=False)
@@ -0,0 +1,194 @@
+import struct
+
+import pytest
+
+from mp3_concat import MAX_CHAPTERS, Mp3Concatenator, build_id3_tag
+from mp3_duration import scan_duration, scan_durations
+from mp3_frames import audio_range, parse_header
+
+
+# MPEG-1 Layer III, 128 kbit/s, 44.1 kHz, stereo, no padding: 417 bytes, 1152 samples
+FRAME_HEADER = b'\xff\xfb\x90\x00'
+FRAME_LENGTH = 417
+SIDE_INFO = 32
+
+
+def frame(payload: bytes = b''):
+    body = FRAME_HEADER + payload
+    return body + b'\x00' * (FRAME_LENGTH - len(body))
+
+
+def xing_frame(frames: int, delay: int = None, padding: int = None):
+    payload = b'\x00' * SIDE_INFO + b'Xing' + struct.pack('>III', 0x03, frames, frames * FRAME_LENGTH)
+    if delay is not None:
+        delay_padding = bytes([delay >> 4, ((delay & 0x0F) << 4) | (padding >> 8), padding & 0xFF])
+        payload += b'LAME3.100' + b'\x00' * 12 + delay_padding
+    return frame(payload)
+
+
+def write_mp3(path, frames: int, xing: bool = True, id3v1: bool = True, **lame):
+    with open(path, 'wb') as f:
+        f.write(build_id3_tag([], title='source', padding=64))
+        if xing:
+            f.write(xing_frame(frames, **lame))
+        f.write(frame() * frames)
+        if id3v1:
+            f.write(b'TAG' + b'\x00' * 125)
+
+
+def read_frames(tag: bytes):
+    """(frame id, payload) pairs of an ID3v2.3 tag, stopping at the padding"""
+    assert tag[:5] == b'ID3\x03\x00'
+    size = (tag[6] << 21) | (tag[7] << 14) | (tag[8] << 7) | tag[9]
+    body = tag[10:10 + size]
+    frames = []
+    offset = 0
+    while offset + 10 <= len(body) and body[offset] != 0:
+        frame_id, length, flags = struct.unpack('>4sIH', body[offset:offset + 10])
+        assert flags == 0
+        frames.append((frame_id.decode('ascii'), body[offset + 10:offset + 10 + length]))
+        offset += 10 + length
+    assert set(body[offset:]) <= {0}
+    return frames
+
+
+def decode_text(payload: bytes):
+    if payload[:1] == b'\x00':
+        return payload[1:].decode('latin-1')
+    assert payload[:1] == b'\x01'
+    return payload[1:].decode('utf-16')
+
+
+CHAPTERS = [
+    {'title': 'Úvodník', 'start_ms': 0, 'end_ms': 61500},
+    {'title': 'Řeč politiků', 'start_ms': 61500, 'end_ms': 185250},
+    {'title': 'Kultura', 'start_ms': 185250, 'end_ms': 300000},
+]
+
+
+def test_chapter_tag_parses_back(tmp_path):
+    cover = tmp_path / 'cover.png'
+    cover.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\x00' * 32)
+
+    tag = build_id3_tag(
+        CHAPTERS, title='Respekt 12/2025', artist='Respekt', album='Respekt 2025',
+        date='2025-03-17T06:05:00', comment='Týdeník – zpravodajství', cover_path=str(cover),
+    )
+    frames = read_frames(tag)
+    by_id = {}
+    for frame_id, payload in frames:
+        by_id.setdefault(frame_id, []).append(payload)
+
+    assert decode_text(by_id['TIT2'][0]) == 'Respekt 12/2025'
+    assert decode_text(by_id['TPE1'][0]) == 'Respekt'
+    assert decode_text(by_id['TALB'][0]) == 'Respekt 2025'
+    assert decode_text(by_id['TYER'][0]) == '2025'
+    assert decode_text(by_id['TDAT'][0]) == '1703'
+    assert decode_text(by_id['TIME'][0]) == '0605'
+
+    comment = by_id['COMM'][0]
+    assert comment[1:4] == b'XXX'
+    assert comment[0:1] == b'\x01'
+    assert comment[4:8] == b'\xff\xfe\x00\x00'
+    assert comment[8:].decode('utf-16') == 'Týdeník – zpravodajství'
+
+    picture = by_id['APIC'][0]
+    assert picture.startswith(b'\x00image/png\x00\x03Cover (front)\x00')
+    assert picture.endswith(cover.read_bytes())
+
+    toc = by_id['CTOC'][0]
+    assert toc[:6] == b'toc\x00\x03' + bytes([len(CHAPTERS)])
+    element_ids = toc[6:].split(b'\x00')[:-1]
+    assert element_ids == [b'chp0', b'chp1', b'chp2']
+
+    parsed = []
+    for payload in by_id['CHAP']:
+        element_id, _, rest = payload.partition(b'\x00')
+        start, end, start_offset, end_offset = struct.unpack('>IIII', rest[:16])
+        assert (start_offset, end_offset) == (0xFFFFFFFF, 0xFFFFFFFF)
+        sub_id, length, _ = struct.unpack('>4sIH', rest[16:26])
+        assert sub_id == b'TIT2'
+        sub_payload = rest[26:26 + length]
+        assert len(rest) == 26 + length
+        parsed.append((element_id, start, end, decode_text(sub_payload)))
+    assert parsed == [
+        (b'chp0', 0, 61500, 'Úvodník'),
+        (b'chp1', 61500, 185250, 'Řeč politiků'),
+        (b'chp2', 185250, 300000, 'Kultura'),
+    ]
+
+
+def test_chapter_titles_use_latin1_when_they_can():
+    frames = dict(read_frames(build_id3_tag([{'title': 'Úvodník', 'start_ms': 0, 'end_ms': 1}])))
+    assert frames['CHAP'].endswith(b'TIT2' + struct.pack('>IH', 8, 0) + b'\x00' + 'Úvodník'.encode('latin-1'))
+
+
+def test_too_many_chapters():
+    chapters = [{'title': str(i), 'start_ms': i, 'end_ms': i + 1} for i in range(MAX_CHAPTERS + 1)]
+
+    build_id3_tag(chapters[:MAX_CHAPTERS])
+    with pytest.raises(ValueError, match='at most 255'):
+        build_id3_tag(chapters)
+
+
+def test_frame_header():
+    header = parse_header(frame(), 0)
+
+    assert (header.version, header.layer, header.bitrate, header.sample_rate) == (1, 3, 128000, 44100)
+    assert (header.length, header.samples, header.mono) == (FRAME_LENGTH, 1152, False)
+    assert parse_header(b'\xff\xfb\xf0\x00', 0) is None
+
+
+def test_audio_range_skips_tags_and_xing(tmp_path):
+    path = tmp_path / 'a.mp3'
+    write_mp3(path, 10, delay=576, padding=1234)
+    data = path.read_bytes()
+
+    start, end, header, info = audio_range(data)
+    assert data[start - FRAME_LENGTH:start].find(b'Xing') == 4 + SIDE_INFO
+    assert end - start == 10 * FRAME_LENGTH
+    assert info == {'kind': 'Xing', 'frames': 10, 'bytes': 10 * FRAME_LENGTH, 'delay': 576, 'padding': 1234}
+
+
+def test_scan_duration_with_and_without_xing(tmp_path):
+    write_mp3(tmp_path / 'xing.mp3', 100)
+    write_mp3(tmp_path / 'plain.mp3', 100, xing=False)
+
+    xing = scan_duration(str(tmp_path / 'xing.mp3'))
+    plain = scan_duration(str(tmp_path / 'plain.mp3'))
+    assert xing['source'] == 'Xing'
+    assert plain['source'] == 'frames'
+    for result in (xing, plain):
+        assert result['samples'] == 100 * 1152
+        assert result['sample_rate'] == 44100
+        assert result['duration_ms'] == pytest.approx(100 * 1152 * 1000 / 44100)
+
+
+def test_scan_durations_skips_broken_files(tmp_path):
+    write_mp3(tmp_path / 'good.mp3', 5)
+    (tmp_path / 'empty.mp3').write_bytes(b'')
+    (tmp_path / 'truncated.mp3').write_bytes(FRAME_HEADER + b'\x00' * SIDE_INFO + b'Xing\x00')
+
+    results = scan_durations([str(tmp_path / name) for name in ('good.mp3', 'empty.mp3', 'truncated.mp3', 'gone.mp3')])
+    assert results[str(tmp_path / 'good.mp3')]['samples'] == 5 * 1152
+    assert results[str(tmp_path / 'empty.mp3')] is None
+    assert results[str(tmp_path / 'truncated.mp3')] is None
+    assert results[str(tmp_path / 'gone.mp3')] is None
+
+
+def test_concat(tmp_path, logger):
+    inputs = [str(tmp_path / f'{i}.mp3') for i in range(3)]
+    for i, path in enumerate(inputs):
+        write_mp3(path, 20 + i)
+    tag = build_id3_tag(CHAPTERS, title='Respekt 12/2025')
+    output = str(tmp_path / 'out.mp3')
+
+    written = Mp3Concatenator(logger).concat(inputs, output, tag, consume=True)
+
+    assert written == (20 + 21 + 22) * FRAME_LENGTH
+    with open(output, 'rb') as f:
+        data = f.read()
+    assert data.startswith(tag)
+    assert data[len(tag):] == frame() * (20 + 21 + 22)
+    assert scan_duration(output)['samples'] == (20 + 21 + 22) * 1152
+    assert not any((tmp_path / f'{i}.mp3').exists() for i in range(3))
@@ -0,0 +1,130 @@
+import pytest
+
+from playlist import EncodingCache, detect_encoding, find_playlist, parse_playlist
+
+
+TRACKS = [
+    ('01 Úvodník.mp3', 'Úvodník: Řeč, která se nežádá', 312.5),
+    ('02 Politika.mp3', 'Šťastný konec? Žluťoučký kůň úpěl ďábelské ódy', 1204.0),
+    ('03 Kultura.mp3', 'Čtenáři se ptají, proč vyšlo číslo později', 98.25),
+]
+
+ENCODINGS = ['cp1250', 'utf-8', 'utf-16']
+
+
+def pls(tracks):
+    lines = ['[playlist]']
+    for i, (filename, title, length) in enumerate(tracks, 1):
+        lines += [f'File{i}=mp3\\{filename}', f'Title{i}={title}', f'Length{i}={int(length * 1000)}']
+    lines += [f'NumberOfEntries={len(tracks)}', 'Version=2']
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def m3u(tracks):
+    lines = ['#EXTM3U']
+    for filename, title, length in tracks:
+        lines += [f'#EXTINF:{length},{title}', f'mp3/{filename}']
+    return '\n'.join(lines) + '\n'
+
+
+def cue(tracks):
+    lines = ['PERFORMER "Respekt"', 'TITLE "Respekt 12/2025"', 'FILE "respekt.mp3" MP3']
+    offset = 0.0
+    for i, (_, title, length) in enumerate(tracks, 1):
+        minutes, seconds = divmod(offset, 60)
+        frames = round((seconds - int(seconds)) * 75)
+        lines += [f'  TRACK {i:02d} AUDIO', f'    TITLE "{title}"', f'    INDEX 01 {int(minutes):02d}:{int(seconds):02d}:{frames:02d}']
+        offset += length
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def write(path, text, encoding):
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_pls(tmp_path, encoding):
+    path = write(tmp_path / 'respekt.pls', pls(TRACKS), encoding)
+
+    chapters, missing = parse_playlist(path, EncodingCache())
+
+    assert missing == []
+    assert chapters == [
+        {'filename': f'mp3/{filename}', 'title': title, 'length': length} for filename, title, length in TRACKS
+    ]
+
+
+@pytest.mark.parametrize('extension, encoding', [('.m3u', encoding) for encoding in ENCODINGS] + [('.m3u8', 'utf-8')])
+def test_m3u(tmp_path, extension, encoding):
+    path = write(tmp_path / f'respekt{extension}', m3u(TRACKS), encoding)
+
+    chapters, missing = parse_playlist(path)
+
+    assert missing == []
+    assert chapters == [
+        {'filename': f'mp3/{filename}', 'title': title, 'length': length} for filename, title, length in TRACKS
+    ]
+
+
+@pytest.mark.parametrize('encoding', ENCODINGS)
+def test_cue(tmp_path, encoding):
+    path = write(tmp_path / 'respekt.cue', cue(TRACKS), encoding)
+
+    chapters, _ = parse_playlist(path)
+
+    assert [chapter['filename'] for chapter in chapters] == ['respekt.mp3'] * len(TRACKS)
+    assert [chapter['title'] for chapter in chapters] == [title for _, title, _ in TRACKS]
+    assert [chapter['offset'] for chapter in chapters] == pytest.approx([0, 312.5, 1516.5], abs=1 / 75)
+
+
+def test_utf8_with_bom(tmp_path):
+    path = write(tmp_path / 'respekt.pls', '\ufeff' + pls(TRACKS), 'utf-8')
+
+    chapters, _ = parse_playlist(path)
+
+    assert chapters[0]['title'] == TRACKS[0][1]
+
+
+def test_missing_entries(tmp_path):
+    text = pls(TRACKS).replace('File2=mp3\\02 Politika.mp3\r\n', '')
+    path = write(tmp_path / 'respekt.pls', text, 'cp1250')
+
+    chapters, missing = parse_playlist(path)
+
+    assert missing == [2]
+    assert [chapter['filename'] for chapter in chapters] == ['mp3/01 Úvodník.mp3', 'mp3/03 Kultura.mp3']
+
+
+def test_sniffs_format_without_extension(tmp_path):
+    path = write(tmp_path / 'playlist.txt', pls(TRACKS), 'utf-8')
+
+    chapters, _ = parse_playlist(path)
+
+    assert len(chapters) == len(TRACKS)
+
+
+def test_detect_encoding():
+    raw = pls(TRACKS).encode('cp1250')
+    assert detect_encoding(pls(TRACKS).encode('utf-16')) == 'utf-16'
+    assert detect_encoding(pls(TRACKS).encode('utf-8')) == 'utf-8'
+    assert raw.decode(detect_encoding(raw)) == pls(TRACKS)
+
+
+def test_encoding_cache_is_persisted(tmp_path):
+    cache_path = str(tmp_path / 'encodings.json')
+    path = write(tmp_path / 'respekt.pls', pls(TRACKS), 'cp1250')
+    cache = EncodingCache(cache_path)
+    parse_playlist(path, cache)
+
+    reloaded = EncodingCache(cache_path)
+
+    assert list(reloaded.entries.values()) == list(cache.entries.values())
+    assert parse_playlist(path, reloaded)[0][1]['title'] == TRACKS[1][1]
+
+
+def test_find_playlist_prefers_pls(tmp_path):
+    names = ['respekt.cue', 'respekt.m3u', 'respekt.pls', 'cover.jpg']
+
+    assert find_playlist(str(tmp_path), names) == str(tmp_path / 'respekt.pls')
+    assert find_playlist(str(tmp_path), ['cover.jpg']) is None
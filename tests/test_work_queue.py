@@ -0,0 +1,184 @@
+import threading
+import types
+
+import pytest
+
+import work_queue
+from work_queue import WorkQueue
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = types.SimpleNamespace(now=1_000_000.0)
+    clock.time = lambda: clock.now
+    monkeypatch.setattr(work_queue, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def queues(tmp_path, logger, clock):
+    path = str(tmp_path / 'shared' / 'queue.sqlite')
+    first = WorkQueue(path, worker_id='worker-a', lease_seconds=60, logger=logger)
+    second = WorkQueue(path, worker_id='worker-b', lease_seconds=60, logger=logger)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def status(queue, slug):
+    row = queue._conn.execute("SELECT status, owner FROM leases WHERE slug = ?", (slug,)).fetchone()
+    return (row['status'], row['owner']) if row else None
+
+
+def test_claim_is_exclusive(queues):
+    a, b = queues
+    a.enqueue(['respekt-12-2025', 'respekt-13-2025'])
+
+    assert status(a, 'respekt-12-2025') == ('queued', None)
+    assert a.claim('respekt-12-2025')
+    assert not b.claim('respekt-12-2025')
+    assert b.claim('respekt-13-2025')
+    assert status(a, 'respekt-12-2025') == ('claimed', 'worker-a')
+    assert a.holds('respekt-12-2025') and not b.holds('respekt-12-2025')
+
+
+def test_claim_again_by_owner(queues):
+    a, _ = queues
+
+    assert a.claim('respekt-12-2025')
+    assert a.claim('respekt-12-2025')
+    assert a.attempts('respekt-12-2025') == 2
+
+
+def test_expired_lease_is_taken_over(queues, clock):
+    a, b = queues
+    a.claim('respekt-12-2025')
+
+    clock.now += 59
+    assert not b.claim('respekt-12-2025')
+    clock.now += 1
+    assert not a.holds('respekt-12-2025')
+    assert b.claim('respekt-12-2025')
+    assert status(a, 'respekt-12-2025') == ('claimed', 'worker-b')
+    assert a.attempts('respekt-12-2025') == 2
+
+
+def test_heartbeat_keeps_the_lease(queues, clock):
+    a, b = queues
+    a.claim('respekt-12-2025')
+    a.claim('respekt-13-2025')
+    b.claim('respekt-14-2025')
+
+    clock.now += 50
+    assert a.heartbeat() == 2
+    clock.now += 50
+    assert a.holds('respekt-12-2025')
+    assert not b.claim('respekt-12-2025')
+    assert not b.holds('respekt-14-2025')
+
+
+def test_complete(queues, clock):
+    a, b = queues
+    a.claim('respekt-12-2025')
+
+    a.complete('respekt-12-2025')
+
+    assert status(a, 'respekt-12-2025') == ('done', None)
+    assert not a.holds('respekt-12-2025')
+    assert not b.claim('respekt-12-2025')
+    clock.now += 3600
+    assert not b.claim('respekt-12-2025')
+    assert a.requeue_expired() == []
+
+
+def test_complete_after_takeover_is_ignored(queues, clock):
+    a, b = queues
+    a.claim('respekt-12-2025')
+    clock.now += 61
+    b.claim('respekt-12-2025')
+
+    a.complete('respekt-12-2025')
+    a.release('respekt-12-2025')
+
+    assert status(a, 'respekt-12-2025') == ('claimed', 'worker-b')
+    assert b.holds('respekt-12-2025')
+
+
+def test_release(queues):
+    a, b = queues
+    a.claim('respekt-12-2025')
+
+    b.release('respekt-12-2025')
+    assert status(a, 'respekt-12-2025') == ('claimed', 'worker-a')
+    a.release('respekt-12-2025')
+    assert status(a, 'respekt-12-2025') == ('queued', None)
+    assert b.claim('respekt-12-2025')
+    assert b.attempts('respekt-12-2025') == 2
+
+
+def test_requeue_expired(queues, clock):
+    a, b = queues
+    a.claim('respekt-12-2025')
+    clock.now += 30
+    a.claim('respekt-13-2025')
+
+    clock.now += 31
+    assert b.requeue_expired() == ['respekt-12-2025']
+    assert status(a, 'respekt-12-2025') == ('queued', None)
+    assert status(a, 'respekt-13-2025') == ('claimed', 'worker-a')
+
+
+def test_enqueue_reclaims_unpublished_done_slugs(queues):
+    a, b = queues
+    for slug in ('respekt-12-2025', 'respekt-13-2025'):
+        a.claim(slug)
+        a.complete(slug)
+    a.enqueue(['respekt-14-2025'])
+    a.claim('respekt-14-2025')
+
+    b.enqueue(['respekt-12-2025', 'respekt-13-2025', 'respekt-14-2025'])
+    assert status(a, 'respekt-12-2025') == ('done', None)
+
+    b.enqueue(['respekt-12-2025', 'respekt-13-2025', 'respekt-14-2025'], unpublished=lambda slug: slug != 'respekt-13-2025')
+    assert status(a, 'respekt-12-2025') == ('queued', None)
+    assert a.attempts('respekt-12-2025') == 0
+    assert status(a, 'respekt-13-2025') == ('done', None)
+    assert status(a, 'respekt-14-2025') == ('claimed', 'worker-a')
+    assert b.claim('respekt-12-2025')
+
+
+def test_claims_stops_with_the_event(queues):
+    a, b = queues
+    b.claim('respekt-13-2025')
+    stop = threading.Event()
+
+    claimed = []
+    for slug in a.claims(['respekt-12-2025', 'respekt-13-2025', 'respekt-14-2025', 'respekt-15-2025'], stop):
+        claimed.append(slug)
+        if slug == 'respekt-14-2025':
+            stop.set()
+
+    assert claimed == ['respekt-12-2025', 'respekt-14-2025']
+    assert status(a, 'respekt-15-2025') is None
+
+
+def test_concurrent_claims_have_one_winner(tmp_path, logger):
+    path = str(tmp_path / 'queue.sqlite')
+    WorkQueue(path, logger=logger).close()
+    queues = [WorkQueue(path, worker_id=f'worker-{i}', logger=logger) for i in range(8)]
+    barrier = threading.Barrier(len(queues))
+    results = []
+
+    def claim(queue):
+        barrier.wait()
+        results.append(queue.claim('respekt-12-2025'))
+
+    threads = [threading.Thread(target=claim, args=(queue,)) for queue in queues]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for queue in queues:
+        queue.close()
+
+    assert sorted(results) == [False] * 7 + [True]
@@ -0,0 +1,103 @@
+import io
+import os
+import struct
+import zipfile
+
+import pytest
+
+from zip_stream import ZipStreamError, ZipStreamExtractor
+
+
+MEMBERS = {
+    'cover.jpg': os.urandom(5000),
+    'mp3/01 Úvodník.mp3': os.urandom(70000),
+    'mp3/02 Politika.mp3': b'respekt ' * 20000,
+}
+
+
+class Unseekable(io.RawIOBase):
+    """Write-only stream, so zipfile writes data descriptors after each member"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+
+def make_zip(members, compression, seekable=True):
+    target = io.BytesIO() if seekable else Unseekable()
+    with zipfile.ZipFile(target, 'w', compression=compression) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return bytes(target.getvalue() if seekable else target.buffer)
+
+
+def chunked(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def extract(data, dest, logger, chunk_size=1000):
+    return ZipStreamExtractor(str(dest), chunk_size=chunk_size, logger=logger).extract(chunked(data, chunk_size))
+
+
+def assert_extracted(dest, members):
+    for name, data in members.items():
+        with open(os.path.join(dest, name), 'rb') as f:
+            assert f.read() == data
+    leftovers = [name for _, _, names in os.walk(dest) for name in names if name.endswith('.partial')]
+    assert leftovers == []
+
+
+@pytest.mark.parametrize('compression', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED])
+def test_round_trip(tmp_path, logger, compression):
+    data = make_zip(MEMBERS, compression)
+
+    assert extract(data, tmp_path, logger) == list(MEMBERS)
+    assert_extracted(tmp_path, MEMBERS)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 64 * 1024])
+def test_deflated_with_data_descriptors(tmp_path, logger, chunk_size):
+    data = make_zip(MEMBERS, zipfile.ZIP_DEFLATED, seekable=False)
+    flags = struct.unpack_from('<H', data, 6)[0]
+    assert flags & 0x08
+
+    assert extract(data, tmp_path, logger, chunk_size) == list(MEMBERS)
+    assert_extracted(tmp_path, MEMBERS)
+
+
+def test_stored_with_data_descriptor_is_rejected(tmp_path, logger):
+    data = make_zip({'a.mp3': b'abc' * 100}, zipfile.ZIP_STORED, seekable=False)
+
+    with pytest.raises(ZipStreamError, match='without sizes'):
+        extract(data, tmp_path, logger)
+
+
+def test_crc_mismatch(tmp_path, logger):
+    data = bytearray(make_zip({'a.mp3': b'abc' * 100}, zipfile.ZIP_STORED))
+    data[30 + len('a.mp3') + 10] ^= 0xFF
+
+    with pytest.raises(ZipStreamError, match='CRC mismatch'):
+        extract(bytes(data), tmp_path, logger)
+    assert os.listdir(tmp_path) == []
+
+
+def test_unsafe_path(tmp_path, logger):
+    data = make_zip({'../evil.mp3': b'x'}, zipfile.ZIP_STORED)
+
+    with pytest.raises(ZipStreamError, match='Unsafe member path'):
+        extract(data, tmp_path / 'out', logger)
+    assert not os.path.exists(tmp_path / 'evil.mp3')
+
+
+def test_truncated_stream(tmp_path, logger):
+    data = make_zip(MEMBERS, zipfile.ZIP_DEFLATED)
+
+    with pytest.raises(ZipStreamError, match='Unexpected end of stream'):
+        extract(data[:len(data) // 2], tmp_path, logger)